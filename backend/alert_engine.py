@@ -0,0 +1,61 @@
+import threading
+
+
+class ThresholdAlertEngine:
+    """
+    Evaluates readings against the capacity and temperature thresholds.
+
+    Thresholds are held in memory and replaced through `configure`, so a
+    reading costs a couple of comparisons and a dict lookup. Each bin and
+    metric has an armed flag: a crossing fires once and disarms, and the
+    metric re-arms only after the value falls `hysteresis` below the
+    threshold. A re-armed metric still cannot fire again until `cooldown`
+    seconds after its previous alert.
+    """
+
+    def __init__(self, capacity=80, temperature=85.0, capacity_hysteresis=5.0,
+                 temperature_hysteresis=2.0, cooldown=300.0):
+        self._thresholds = {'capacity': capacity, 'temperature': temperature}
+        self._hysteresis = {'capacity': capacity_hysteresis, 'temperature': temperature_hysteresis}
+        self._cooldown = cooldown
+        self._bins = {}  # bin_id -> {metric: {'armed': bool, 'last_fired': epoch seconds}}
+        self._lock = threading.Lock()
+
+    def configure(self, capacity, temperature):
+        """Replace the thresholds, e.g. after settings are saved"""
+        with self._lock:
+            self._thresholds = {'capacity': capacity, 'temperature': temperature}
+
+    def reset(self):
+        """Re-arm every bin, e.g. after the bins were emptied"""
+        with self._lock:
+            self._bins.clear()
+
+    def evaluate(self, bin_id, fill_level, temperature, timestamp):
+        """Return the (metric, value, threshold) crossings that should raise an alert"""
+        now = timestamp.timestamp()
+        fired = []
+        with self._lock:
+            state = self._bins.get(bin_id)
+            if state is None:
+                state = self._bins[bin_id] = {
+                    'capacity': {'armed': True, 'last_fired': None},
+                    'temperature': {'armed': True, 'last_fired': None}
+                }
+            for metric, value in (('capacity', fill_level), ('temperature', temperature)):
+                if value is None:
+                    continue
+                threshold = self._thresholds[metric]
+                metric_state = state[metric]
+                if not metric_state['armed']:
+                    if value < threshold - self._hysteresis[metric]:
+                        metric_state['armed'] = True
+                    continue
+                if value < threshold:
+                    continue
+                metric_state['armed'] = False
+                last_fired = metric_state['last_fired']
+                if last_fired is None or now - last_fired >= self._cooldown:
+                    metric_state['last_fired'] = now
+                    fired.append((metric, value, threshold))
+        return fired
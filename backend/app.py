@@ -1,31 +1,128 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, has_request_context, jsonify, request, stream_with_context
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime, timezone
-from sqlalchemy import func
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event, func, insert, inspect, literal, text, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from werkzeug.exceptions import HTTPException
+import atexit
+import math
+import os
+import threading
+import time
+
+from alert_engine import ThresholdAlertEngine
+import binary_format
+from bin_state import BinStateRegistry
+from event_hub import EventHub
+import export
+from forecast import FillRateForecaster
+from metrics import COUNT_BUCKETS, MetricsRegistry
+from response_cache import ResponseCache
+import rollups
+from write_behind import WriteBehindQueue
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['X-Next-Cursor'])
 
 # SQLite Configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///wastewise.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('WASTEWISE_DATABASE_URI', 'sqlite:///wastewise.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Write-behind mode: acknowledge single readings once queued and commit them in groups
+app.config['WRITE_BEHIND'] = os.environ.get('WASTEWISE_WRITE_BEHIND', '0') == '1'
+app.config['WRITE_BEHIND_MAX_QUEUE'] = int(os.environ.get('WASTEWISE_WRITE_BEHIND_MAX_QUEUE', 10000))
+app.config['WRITE_BEHIND_BATCH_SIZE'] = int(os.environ.get('WASTEWISE_WRITE_BEHIND_BATCH_SIZE', 500))
+app.config['WRITE_BEHIND_FLUSH_INTERVAL'] = float(os.environ.get('WASTEWISE_WRITE_BEHIND_FLUSH_INTERVAL', 0.25))
+app.config['WRITE_BEHIND_MAX_RETRIES'] = int(os.environ.get('WASTEWISE_WRITE_BEHIND_MAX_RETRIES', 3))
+app.config['WRITE_BEHIND_RETRY_BACKOFF'] = float(os.environ.get('WASTEWISE_WRITE_BEHIND_RETRY_BACKOFF', 0.5))
+# Alerts older than this are deleted by the background retention job
+app.config['ALERT_RETENTION_DAYS'] = float(os.environ.get('WASTEWISE_ALERT_RETENTION_DAYS', 90))
 db = SQLAlchemy(app)
 
+WASTE_TYPES = ('recyclable', 'organic', 'non-recyclable')
+DEFAULT_BIN_ID = 'bin-1'
+MAX_BATCH_SIZE = 5000  # readings accepted per /api/measurements/batch request
+ARCHIVE_CHUNK_SIZE = 5000  # measurements moved to the archive per transaction
+EXPORT_CHUNK_SIZE = 2000  # rows read per short transaction by /api/export
+DEFAULT_MAX_POINTS = 500  # points per series returned by /api/measurements
+MAX_SERIES_POINTS = 5000
+DEFAULT_PAGE_SIZE = 50  # historical records per /api/historical-stats page
+MAX_PAGE_SIZE = 500
+FORECAST_HISTORY_HOURS = 24  # minute rollups the forecaster is refitted from
+DEFAULT_ALERT_PAGE_SIZE = 10  # alerts per /api/alerts page
+ALERT_COALESCE_WINDOW = timedelta(hours=24)  # repeats of an unread alert within this fold into it
+ALERT_BATCH_SIZE = 1000  # alerts deleted or updated per transaction by bulk actions and retention
+ALERT_RETENTION_INTERVAL = 3600  # seconds between retention passes
+
 # Models
 class WasteMeasurement(db.Model):
     id = db.Column(db.Integer, primary_key=True)
+    bin_id = db.Column(db.String(50), nullable=False, default=DEFAULT_BIN_ID, server_default=DEFAULT_BIN_ID)
     timestamp = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
     fill_level = db.Column(db.Float, nullable=False)  # percentage
     waste_type = db.Column(db.String(20), nullable=False)  # 'recyclable', 'organic', 'non-recyclable'
     temperature = db.Column(db.Float)  # in Fahrenheit
 
-class Alert(db.Model):
+    __table_args__ = (
+        db.Index('ix_waste_measurement_bin_id_timestamp', 'bin_id', 'timestamp'),
+        db.Index('ix_waste_measurement_waste_type_timestamp', 'waste_type', 'timestamp'),
+        # Ids must never be reused once archived rows are deleted: resets use them as watermarks
+        {'sqlite_autoincrement': True}
+    )
+
+class WasteMeasurementArchive(db.Model):
+    """Measurements cleared by a bin reset, kept for analytics"""
+    id = db.Column(db.Integer, primary_key=True)  # id the row had in WasteMeasurement
+    bin_id = db.Column(db.String(50), nullable=False)
+    timestamp = db.Column(db.DateTime, nullable=False)
+    fill_level = db.Column(db.Float, nullable=False)
+    waste_type = db.Column(db.String(20), nullable=False)
+    temperature = db.Column(db.Float)
+    reset_id = db.Column(db.Integer, db.ForeignKey('bin_reset.id'), nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_waste_measurement_archive_bin_id_timestamp', 'bin_id', 'timestamp'),
+    )
+
+class BinReset(db.Model):
+    """A bin reset; measurements up to last_measurement_id belong to the cycle it closed"""
     id = db.Column(db.Integer, primary_key=True)
     timestamp = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    last_measurement_id = db.Column(db.Integer, nullable=False)
+    historical_stats_id = db.Column(db.Integer, db.ForeignKey('historical_stats.id'))
+    archived = db.Column(db.Boolean, nullable=False, default=False)
+
+class MeasurementRollup(db.Model):
+    """Per-bucket summary of measurements, maintained on every insert"""
+    resolution = db.Column(db.String(10), primary_key=True)  # 'minute', 'hour', 'day'
+    bin_id = db.Column(db.String(50), primary_key=True)
+    bucket = db.Column(db.DateTime, primary_key=True)  # bucket start, UTC
+    waste_type = db.Column(db.String(20), primary_key=True)
+    sample_count = db.Column(db.Integer, nullable=False)
+    fill_min = db.Column(db.Float, nullable=False)
+    fill_max = db.Column(db.Float, nullable=False)
+    fill_sum = db.Column(db.Float, nullable=False)
+    max_temperature = db.Column(db.Float)
+
+class Bin(db.Model):
+    bin_id = db.Column(db.String(50), primary_key=True)
+    location = db.Column(db.String(100))
+
+class Alert(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    timestamp = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))  # latest occurrence
     message = db.Column(db.String(200), nullable=False)
     location = db.Column(db.String(100), nullable=False)
     is_read = db.Column(db.Boolean, default=False)
+    occurrences = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    first_seen = db.Column(db.DateTime)  # NULL for alerts that never repeated before this column existed
+
+    __table_args__ = (
+        db.Index('ix_alert_timestamp_id', 'timestamp', 'id'),
+        db.Index('ix_alert_is_read_timestamp_id', 'is_read', 'timestamp', 'id'),
+        db.Index('ix_alert_location_timestamp_id', 'location', 'timestamp', 'id'),
+    )
 
 class Settings(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -45,66 +142,781 @@ class HistoricalStats(db.Model):
     max_temperature = db.Column(db.Float)
     fill_duration_hours = db.Column(db.Float)  # Time taken to fill the bin
 
-# Routes
-# Add this near the top of the file, after the db initialization
-current_stats = {'fill_level': 0}  # Global variable to store current fill level
+    __table_args__ = (
+        db.Index('ix_historical_stats_timestamp_id', 'timestamp', 'id'),
+    )
+
+class HistoricalStatsAggregate(db.Model):
+    """Single row of running sums over HistoricalStats, updated with every archived cycle"""
+    id = db.Column(db.Integer, primary_key=True)
+    cycle_count = db.Column(db.Integer, nullable=False, default=0)
+    recyclable_sum = db.Column(db.Float, nullable=False, default=0)
+    organic_sum = db.Column(db.Float, nullable=False, default=0)
+    non_recyclable_sum = db.Column(db.Float, nullable=False, default=0)
+    efficiency_sum = db.Column(db.Float, nullable=False, default=0)
+    # Nullable columns keep their own counts, matching AVG() which skips NULLs
+    max_temperature_sum = db.Column(db.Float, nullable=False, default=0)
+    max_temperature_count = db.Column(db.Integer, nullable=False, default=0)
+    fill_duration_sum = db.Column(db.Float, nullable=False, default=0)
+    fill_duration_count = db.Column(db.Integer, nullable=False, default=0)
+
+# Ingestion helpers
+def _as_utc(value):
+    """Treat naive datetimes loaded from SQLite as UTC"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+def _parse_timestamp(value):
+    """Parse an ISO 8601 string or epoch seconds into an aware UTC datetime"""
+    if value is None:
+        return datetime.now(timezone.utc)
+    if isinstance(value, bool):
+        raise ValueError('timestamp must be an ISO 8601 string or epoch seconds')
+    if isinstance(value, (int, float)) or (isinstance(value, str) and value.replace('.', '', 1).isdigit()):
+        try:
+            return datetime.fromtimestamp(float(value), timezone.utc)
+        except (OverflowError, OSError):
+            raise ValueError('timestamp is out of range')
+    if isinstance(value, str):
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if parsed.tzinfo is None:
+            return parsed.replace(tzinfo=timezone.utc)
+        return parsed.astimezone(timezone.utc)
+    raise ValueError('timestamp must be an ISO 8601 string or epoch seconds')
+
+def _finite_number(value, name):
+    """Return a reading field as a finite float; raises ValueError for NaN, infinities and huge integers"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f'{name} must be a number')
+    try:
+        value = float(value)
+    except OverflowError:
+        raise ValueError(f'{name} is out of range')
+    if not math.isfinite(value):
+        raise ValueError(f'{name} must be a finite number')
+    return value
+
+def _parse_reading(item):
+    """Validate one reading payload and return a WasteMeasurement row dict"""
+    if not isinstance(item, dict):
+        raise ValueError('reading must be an object')
+
+    fill_level = _finite_number(item.get('fill_level'), 'fill_level')
+    if not 0 <= fill_level <= 100:
+        raise ValueError('fill_level must be between 0 and 100')
+
+    waste_type = item.get('waste_type', 'non-recyclable')
+    if waste_type not in WASTE_TYPES:
+        raise ValueError(f"waste_type must be one of {', '.join(WASTE_TYPES)}")
+
+    temperature = item.get('temperature')
+    if temperature is not None:
+        temperature = _finite_number(temperature, 'temperature')
+
+    bin_id = item.get('bin_id', DEFAULT_BIN_ID)
+    if not isinstance(bin_id, str) or not bin_id or len(bin_id) > 50:
+        raise ValueError('bin_id must be a non-empty string of at most 50 characters')
+
+    row = {
+        'bin_id': bin_id,
+        'timestamp': _parse_timestamp(item.get('timestamp')),
+        'fill_level': fill_level,
+        'waste_type': waste_type,
+        'temperature': temperature
+    }
+
+    location = item.get('location')
+    if location is not None:
+        if not isinstance(location, str) or len(location) > 100:
+            raise ValueError('location must be a string of at most 100 characters')
+        row['location'] = location
+    return row
+
+def _store_measurements(rows):
+    """Insert validated reading rows with a single executemany in the current transaction"""
+    if not rows:
+        return
+    measurements = []
+    moved_bins = {}
+    for row in rows:
+        if 'location' in row:
+            row = dict(row)
+            location = row.pop('location')
+            if bin_locations.get(row['bin_id']) != location:
+                moved_bins[row['bin_id']] = location
+        measurements.append(row)
+    # Core executemany: the ORM bulk path would emit one INSERT per row to fetch server defaults
+    db.session.connection().execute(WasteMeasurement.__table__.insert(), measurements)
+    _merge_rollups(measurements)
+
+    # Bin locations rarely change, so only write them when they differ from the cached value
+    if moved_bins:
+        statement = sqlite_insert(Bin).values([
+            {'bin_id': bin_id, 'location': location} for bin_id, location in moved_bins.items()
+        ])
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=[Bin.bin_id],
+            set_={'location': statement.excluded.location}
+        ))
+        bin_locations.update(moved_bins)
+
+def _merge_rollups(rows):
+    """Fold new measurements into the minute/hour/day rollups with one upsert per bucket"""
+    statement = sqlite_insert(MeasurementRollup)
+    excluded = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[
+            MeasurementRollup.resolution,
+            MeasurementRollup.bin_id,
+            MeasurementRollup.bucket,
+            MeasurementRollup.waste_type
+        ],
+        set_={
+            'sample_count': MeasurementRollup.sample_count + excluded.sample_count,
+            'fill_min': func.min(MeasurementRollup.fill_min, excluded.fill_min),
+            'fill_max': func.max(MeasurementRollup.fill_max, excluded.fill_max),
+            'fill_sum': MeasurementRollup.fill_sum + excluded.fill_sum,
+            # Two-argument max() is NULL if either side is, so coalesce both ways
+            'max_temperature': func.max(
+                func.coalesce(MeasurementRollup.max_temperature, excluded.max_temperature),
+                func.coalesce(excluded.max_temperature, MeasurementRollup.max_temperature)
+            )
+        }
+    )
+    db.session.connection().execute(statement, rollups.aggregate(rows))
+
+def backfill_rollups():
+    """Build rollups for measurements stored before rollups existed"""
+    if db.session.query(MeasurementRollup.resolution).first() is not None:
+        return
+    if db.session.query(WasteMeasurement.id).first() is None:
+        return
+    for resolution, bucket_format in rollups.SQLITE_BUCKET_FORMATS.items():
+        bucket = func.strftime(bucket_format, WasteMeasurement.timestamp)
+        db.session.execute(insert(MeasurementRollup).from_select(
+            ['resolution', 'bin_id', 'bucket', 'waste_type', 'sample_count',
+             'fill_min', 'fill_max', 'fill_sum', 'max_temperature'],
+            db.select(
+                literal(resolution),
+                WasteMeasurement.bin_id,
+                bucket,
+                WasteMeasurement.waste_type,
+                func.count(),
+                func.min(WasteMeasurement.fill_level),
+                func.max(WasteMeasurement.fill_level),
+                func.sum(WasteMeasurement.fill_level),
+                func.max(WasteMeasurement.temperature)
+            ).group_by(WasteMeasurement.bin_id, bucket, WasteMeasurement.waste_type)
+        ))
+    db.session.commit()
+
+def _record_readings(rows):
+    """Publish accepted readings to the in-memory latest-state registry"""
+    changed = {}
+    alerts = []
+    ingested = {}
+    for row in rows:
+        ingested[row['bin_id']] = ingested.get(row['bin_id'], 0) + 1
+        previous = bin_states.get(row['bin_id'])
+        state = bin_states.update(
+            row['bin_id'],
+            row['fill_level'],
+            row['timestamp'],
+            waste_type=row['waste_type'],
+            temperature=row['temperature'],
+            location=row.get('location')
+        )
+        if previous is None or previous['fill_level'] != state['fill_level']:
+            changed[state['bin_id']] = state
+        forecaster.update(row['bin_id'], row['timestamp'].timestamp(), row['fill_level'])
+
+        for metric, value, threshold in alert_engine.evaluate(
+                row['bin_id'], row['fill_level'], row['temperature'], row['timestamp']):
+            if metric == 'capacity':
+                message = f"Bin {row['bin_id']} is at {value:.0f}% capacity"
+            else:
+                message = f"Bin {row['bin_id']} temperature is {value:.1f}°F (limit {threshold:.1f}°F)"
+            alerts.append({
+                'message': message,
+                'location': state['location'] or row['bin_id'],
+                'timestamp': row['timestamp']
+            })
+
+    for bin_id, count in ingested.items():
+        readings_ingested.inc(bin_id, amount=count)
+
+    # One event per bin per request, and only when its fill level moved
+    for bin_id, state in changed.items():
+        events.publish('fill-level', _serialize_bin_state(state), bin_id=bin_id)
+
+    # Crossings are rare thanks to hysteresis and cooldown, so they get their own commit
+    if alerts:
+        raised = _raise_alerts(alerts)
+        db.session.commit()
+        _publish_alerts(raised)
 
+def _raise_alerts(candidates):
+    """
+    Add alerts to the session, folding each into the newest unread alert with
+    the same message and location seen within ALERT_COALESCE_WINDOW. Returns
+    (alert, created) pairs, one per distinct alert touched.
+    """
+    raised = {}
+    for candidate in candidates:
+        timestamp = candidate.get('timestamp') or datetime.now(timezone.utc)
+        key = (candidate['message'], candidate['location'])
+        alert = raised[key][0] if key in raised else Alert.query.filter(
+            Alert.location == candidate['location'],
+            Alert.timestamp >= timestamp - ALERT_COALESCE_WINDOW,
+            Alert.message == candidate['message'],
+            Alert.is_read == False
+        ).order_by(Alert.timestamp.desc(), Alert.id.desc()).first()
+        if alert is None:
+            alert = Alert(message=candidate['message'], location=candidate['location'],
+                          timestamp=timestamp, first_seen=timestamp)
+            db.session.add(alert)
+            raised[key] = (alert, True)
+            continue
+        if alert.first_seen is None:
+            alert.first_seen = alert.timestamp
+        alert.occurrences += 1
+        alert.timestamp = max(_as_utc(alert.timestamp), _as_utc(timestamp))
+        raised.setdefault(key, (alert, False))
+    db.session.flush()
+    return list(raised.values())
+
+def _publish_alerts(raised):
+    responses.invalidate('alerts')
+    for alert, created in raised:
+        events.publish('alert-created' if created else 'alert-updated', _serialize_alert(alert))
+
+def load_alert_thresholds():
+    """Refresh the alert engine's in-memory thresholds from the Settings row"""
+    settings = Settings.query.first()
+    if settings:
+        alert_engine.configure(settings.threshold_capacity, settings.threshold_temperature)
+
+def _serialize_bin_state(state):
+    return {
+        'bin_id': state['bin_id'],
+        'fill_level': state['fill_level'],
+        'waste_type': state['waste_type'],
+        'temperature': state['temperature'],
+        'location': state['location'],
+        'timestamp': state['timestamp'].strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+def warm_load_bin_states():
+    """Seed the registry from the newest measurement of every bin"""
+    bin_locations.update(db.session.execute(db.select(Bin.bin_id, Bin.location)).all())
+    latest = db.select(
+        WasteMeasurement.bin_id,
+        func.max(WasteMeasurement.timestamp).label('timestamp')
+    ).group_by(WasteMeasurement.bin_id).subquery()
+    measurements = db.session.execute(
+        db.select(WasteMeasurement).join(latest, db.and_(
+            WasteMeasurement.bin_id == latest.c.bin_id,
+            WasteMeasurement.timestamp == latest.c.timestamp
+        ))
+    ).scalars()
+    for m in measurements:
+        bin_states.update(
+            m.bin_id,
+            m.fill_level,
+            _as_utc(m.timestamp),
+            waste_type=m.waste_type,
+            temperature=m.temperature,
+            location=bin_locations.get(m.bin_id)
+        )
+
+def rebuild_forecasts(hours=FORECAST_HISTORY_HOURS):
+    """Refit every bin's forecast from the per-minute averages of the current fill cycle"""
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    last_reset = db.session.query(func.max(BinReset.timestamp)).scalar()
+    if last_reset is not None:
+        since = max(since, _as_utc(last_reset))
+    rows = db.session.execute(
+        db.select(
+            MeasurementRollup.bin_id,
+            func.strftime('%s', MeasurementRollup.bucket),
+            func.sum(MeasurementRollup.fill_sum) / func.sum(MeasurementRollup.sample_count)
+        ).where(
+            MeasurementRollup.resolution == 'minute',
+            MeasurementRollup.bucket >= rollups.truncate(since, 'minute')
+        ).group_by(MeasurementRollup.bin_id, MeasurementRollup.bucket)
+    ).all()
+    if rows:
+        bin_ids, buckets, fill_levels = zip(*rows)
+        forecaster.fit_batch(bin_ids, [float(bucket) for bucket in buckets], fill_levels)
+    return len(rows)
+
+bin_states = BinStateRegistry()
+events = EventHub()
+forecaster = FillRateForecaster()
+alert_engine = ThresholdAlertEngine()
+responses = ResponseCache()
+bin_locations = {}  # bin_id -> location as last persisted in the Bin table
+
+def _flush_measurements(rows):
+    """Commit a group of queued readings from the write-behind flusher thread"""
+    with app.app_context():
+        try:
+            _store_measurements(rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+measurement_queue = None
+if app.config['WRITE_BEHIND']:
+    measurement_queue = WriteBehindQueue(
+        _flush_measurements,
+        max_size=app.config['WRITE_BEHIND_MAX_QUEUE'],
+        batch_size=app.config['WRITE_BEHIND_BATCH_SIZE'],
+        flush_interval=app.config['WRITE_BEHIND_FLUSH_INTERVAL'],
+        max_retries=app.config['WRITE_BEHIND_MAX_RETRIES'],
+        retry_backoff=app.config['WRITE_BEHIND_RETRY_BACKOFF'],
+        logger=app.logger
+    ).start()
+    atexit.register(measurement_queue.stop)
+
+# Instrumentation
+metrics = MetricsRegistry()
+request_latency = metrics.histogram(
+    'wastewise_http_request_duration_seconds', 'HTTP request latency', ('method', 'route', 'status'))
+request_db_queries = metrics.histogram(
+    'wastewise_http_request_db_queries', 'SQL statements executed per request', ('route',), COUNT_BUCKETS)
+request_db_seconds = metrics.histogram(
+    'wastewise_http_request_db_seconds', 'Time spent in SQL statements per request', ('route',))
+db_queries = metrics.counter(
+    'wastewise_db_queries_total', 'SQL statements executed', ('context',))
+db_seconds = metrics.counter(
+    'wastewise_db_query_seconds_total', 'Time spent in SQL statements', ('context',))
+readings_ingested = metrics.counter(
+    'wastewise_readings_ingested_total', 'Readings accepted for storage', ('bin_id',))
+handler_errors = metrics.counter(
+    'wastewise_handler_errors_total', 'Exceptions turned into error responses or logged by workers', ('route', 'exception'))
+metrics.gauge('wastewise_bins_tracked', 'Bins in the latest-state registry', lambda: len(bin_states))
+metrics.gauge('wastewise_event_subscribers', 'Open server-sent event streams', lambda: len(events))
+if measurement_queue is not None:
+    metrics.gauge('wastewise_write_behind_queue_depth', 'Readings waiting to be committed',
+                  lambda: measurement_queue.stats()['depth'])
+    metrics.gauge('wastewise_write_behind_capacity', 'Readings the write-behind queue holds before rejecting',
+                  lambda: measurement_queue.stats()['capacity'])
+    metrics.gauge('wastewise_write_behind_flush_seconds', 'Duration of the last and the slowest flush',
+                  lambda: {(stat,): measurement_queue.stats()[key]
+                           for stat, key in (('last', 'flushSecondsLast'), ('max', 'flushSecondsMax'))}, ('stat',))
+    metrics.counter_callback('wastewise_write_behind_readings_total', 'Readings through the write-behind queue',
+                             lambda: {(outcome,): measurement_queue.stats()[outcome]
+                                      for outcome in ('enqueued', 'rejected', 'flushed', 'dropped')}, ('outcome',))
+    metrics.counter_callback('wastewise_write_behind_retries_total', 'Failed write-behind flushes scheduled for a retry',
+                             lambda: measurement_queue.stats()['retries'])
+    metrics.counter_callback('wastewise_write_behind_flushes_total', 'Write-behind flushes attempted',
+                             lambda: measurement_queue.stats()['flushes'])
+    metrics.counter_callback('wastewise_write_behind_failed_flushes_total', 'Write-behind flushes that failed',
+                             lambda: measurement_queue.stats()['failedFlushes'])
+    metrics.counter_callback('wastewise_write_behind_flush_seconds_total', 'Time spent flushing',
+                             lambda: measurement_queue.stats()['flushSecondsTotal'])
+
+def _route_label():
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+def _error_response(e):
+    """Count an exception caught by a route handler and turn it into a 500 response"""
+    handler_errors.inc(_route_label(), type(e).__name__)
+    return jsonify({'error': str(e)}), 500
+
+@app.errorhandler(Exception)
+def _handle_uncaught_exception(e):
+    """Turn an exception no route handled into a counted 500, so after_request still records it"""
+    if isinstance(e, HTTPException):
+        return e
+    app.logger.exception('Unhandled exception on %s', request.path)
+    return _error_response(e)
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+    g.db_queries = 0
+    g.db_seconds = 0.0
+
+@app.after_request
+def _record_request_metrics(response):
+    started = g.get('request_started')
+    if started is not None:
+        route = _route_label()
+        request_latency.observe(time.perf_counter() - started, request.method, route, f'{response.status_code // 100}xx')
+        request_db_queries.observe(g.db_queries, route)
+        request_db_seconds.observe(g.db_seconds, route)
+    return response
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_started'] = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_started']
+    if has_request_context() and 'db_queries' in g:
+        g.db_queries += 1
+        g.db_seconds += elapsed
+        context_label = 'request'
+    else:
+        context_label = 'background'
+    db_queries.inc(context_label)
+    db_seconds.inc(context_label, amount=elapsed)
+
+# Routes
 @app.route('/api/current-stats', methods=['GET', 'POST'])
 def handle_stats():
     if request.method == 'POST':
-        data = request.get_json()
-        fill_level = data.get('fill_level', 0)
-        current_stats['fill_level'] = fill_level
-        
+        try:
+            if request.mimetype == binary_format.CONTENT_TYPE:
+                records = binary_format.decode(request.get_data())
+                if len(records) != 1:
+                    return jsonify({'error': 'Expected exactly one record, use /api/measurements/batch for more'}), 400
+                data = records[0]
+            else:
+                data = request.get_json(silent=True)
+                if not isinstance(data, dict):
+                    return jsonify({'error': 'Expected a JSON object'}), 400
+            # Only fill level is tracked for now, so it defaults to non-recyclable waste
+            reading = _parse_reading({'fill_level': 0, **data})
+        except (ValueError, TypeError, OverflowError) as e:
+            return jsonify({'error': str(e)}), 400
+        fill_level = reading['fill_level']
+
+        if measurement_queue is not None:
+            if not measurement_queue.offer(reading):
+                return jsonify({'error': 'Ingestion queue is full, retry later'}), 429
+            _record_readings([reading])
+            return jsonify({"status": "queued", "fill_level": fill_level}), 202
+
         # Store in database
-        measurement = WasteMeasurement(
-            fill_level=fill_level,
-            waste_type='non-recyclable'  # Since we're only tracking fill level now
-        )
-        db.session.add(measurement)
+        _store_measurements([reading])
         db.session.commit()
+        _record_readings([reading])
         
         return jsonify({"status": "success", "fill_level": fill_level})
     else:  # GET request
-        return jsonify({"fill_level": current_stats.get('fill_level', 0)})
+        bin_id = request.args.get('bin_id', DEFAULT_BIN_ID)
+        state = bin_states.get(bin_id)
+        if state is None:
+            return jsonify({"bin_id": bin_id, "fill_level": 0})
+        return jsonify(_serialize_bin_state(state))
+
+@app.route('/api/bins', methods=['GET'])
+def get_bins():
+    """Get the latest state of many bins from memory, optionally filtered"""
+    try:
+        bin_ids = request.args.get('bin_id')
+        states = bin_states.snapshot(
+            bin_ids=bin_ids.split(',') if bin_ids else None,
+            location=request.args.get('location'),
+            min_fill=request.args.get('min_fill', type=float),
+            max_fill=request.args.get('max_fill', type=float)
+        )
+        return jsonify({
+            'count': len(states),
+            'bins': [_serialize_bin_state(state) for state in states]
+        })
+    except Exception as e:
+        return _error_response(e)
+
+@app.route('/api/measurements/batch', methods=['POST'])
+def ingest_batch():
+    """Validate and store many readings in one transaction"""
+    if request.mimetype == binary_format.CONTENT_TYPE:
+        try:
+            readings = binary_format.decode(request.get_data())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    else:
+        data = request.get_json(silent=True)
+        readings = data.get('readings') if isinstance(data, dict) else data
+    if not isinstance(readings, list) or not readings:
+        return jsonify({'error': 'Expected a non-empty list of readings'}), 400
+    if len(readings) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'Batch exceeds {MAX_BATCH_SIZE} readings'}), 413
+
+    rows = []
+    results = []
+    for index, item in enumerate(readings):
+        try:
+            rows.append(_parse_reading(item))
+            results.append({'index': index, 'status': 'ok'})
+        except (ValueError, TypeError, OverflowError) as e:
+            results.append({'index': index, 'status': 'error', 'error': str(e)})
+
+    if rows:
+        try:
+            _store_measurements(rows)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return _error_response(e)
+        _record_readings(rows)
+
+    return jsonify({
+        'accepted': len(rows),
+        'rejected': len(readings) - len(rows),
+        'results': results
+    }), 200 if rows else 400
+
+def _serialize_forecast(forecast):
+    def when(epoch):
+        return datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    return {
+        'bin_id': forecast['bin_id'],
+        'location': bin_locations.get(forecast['bin_id']),
+        'fill_level': round(forecast['fill_level'], 2),
+        'fill_rate_per_hour': round(forecast['fill_rate_per_hour'], 3) if forecast['fill_rate_per_hour'] is not None else None,
+        'hours_to_full': round(forecast['hours_to_full'], 2) if forecast['hours_to_full'] is not None else None,
+        'predicted_full_at': when(forecast['predicted_full_at']) if forecast['predicted_full_at'] is not None else None,
+        'last_reading_at': when(forecast['last_reading_at']),
+        'samples': forecast['samples']
+    }
+
+@app.route('/api/forecast', methods=['GET'])
+def get_forecast():
+    """Get bins ordered by predicted time-to-full, from the in-memory model"""
+    limit = request.args.get('limit', type=int)
+    within = request.args.get('within_hours', type=float)
+    forecasts = forecaster.forecasts()
+    if within is not None:
+        forecasts = [f for f in forecasts if f['hours_to_full'] is not None and f['hours_to_full'] <= within]
+    if limit is not None:
+        forecasts = forecasts[:max(limit, 0)]
+    return jsonify([_serialize_forecast(f) for f in forecasts])
+
+@app.route('/api/forecast/recompute', methods=['POST'])
+def recompute_forecast():
+    """Refit all forecasts from stored history"""
+    try:
+        hours = request.args.get('hours', FORECAST_HISTORY_HOURS, type=float)
+        points = rebuild_forecasts(hours)
+        return jsonify({'points': points, 'bins': len(forecaster)})
+    except Exception as e:
+        return _error_response(e)
+
+@app.route('/api/measurements', methods=['GET'])
+def get_measurements():
+    """Get a bin's fill history at the finest resolution that fits the point budget"""
+    try:
+        bin_id = request.args.get('bin_id', DEFAULT_BIN_ID)
+        waste_type = request.args.get('waste_type')
+        end = _parse_timestamp(request.args.get('end'))
+        start = request.args.get('start')
+        start = _parse_timestamp(start) if start else end - timedelta(days=1)
+        max_points = min(request.args.get('max_points', DEFAULT_MAX_POINTS, type=int), MAX_SERIES_POINTS)
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    if start >= end or max_points <= 0:
+        return jsonify({'error': 'Expected start < end and a positive max_points'}), 400
+
+    try:
+        # Readings cleared by a reset live on in the archive; the rollups still cover them
+        raw_selects = []
+        for table in (WasteMeasurement, WasteMeasurementArchive):
+            raw_filter = [table.bin_id == bin_id, table.timestamp >= start, table.timestamp < end]
+            if waste_type:
+                raw_filter.append(table.waste_type == waste_type)
+            raw_selects.append(db.select(
+                table.timestamp, table.waste_type, table.fill_level, table.temperature
+            ).where(*raw_filter))
+        raw_rows = union_all(*raw_selects).subquery()
+        # Counting stops one row past the budget, so this never scans the whole range
+        raw_count = db.session.execute(db.select(func.count()).select_from(
+            db.select(raw_rows.c.timestamp).limit(max_points + 1).subquery()
+        )).scalar()
+        resolution = rollups.choose_resolution(end - start, max_points, raw_count)
+
+        if resolution == 'raw':
+            rows = db.session.execute(db.select(raw_rows).order_by(raw_rows.c.timestamp))
+            points = [{
+                'timestamp': row.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                'wasteType': row.waste_type,
+                'fillMin': row.fill_level,
+                'fillMax': row.fill_level,
+                'fillAvg': row.fill_level,
+                'maxTemperature': row.temperature,
+                'samples': 1
+            } for row in rows]
+        else:
+            query = MeasurementRollup.query.filter(
+                MeasurementRollup.resolution == resolution,
+                MeasurementRollup.bin_id == bin_id,
+                MeasurementRollup.bucket >= rollups.truncate(start, resolution),
+                MeasurementRollup.bucket < end
+            )
+            if waste_type:
+                query = query.filter(MeasurementRollup.waste_type == waste_type)
+            points = [{
+                'timestamp': row.bucket.strftime('%Y-%m-%d %H:%M:%S'),
+                'wasteType': row.waste_type,
+                'fillMin': row.fill_min,
+                'fillMax': row.fill_max,
+                'fillAvg': round(row.fill_sum / row.sample_count, 2),
+                'maxTemperature': row.max_temperature,
+                'samples': row.sample_count
+            } for row in query.order_by(MeasurementRollup.bucket)]
+
+        return jsonify({
+            'binId': bin_id,
+            'resolution': resolution,
+            'start': start.strftime('%Y-%m-%d %H:%M:%S'),
+            'end': end.strftime('%Y-%m-%d %H:%M:%S'),
+            'points': points
+        })
+    except Exception as e:
+        return _error_response(e)
+
+def _serialize_alert(alert):
+    return {
+        'id': alert.id,
+        'message': alert.message,
+        'location': alert.location,
+        'timestamp': alert.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+        'firstSeen': (alert.first_seen or alert.timestamp).strftime('%Y-%m-%d %H:%M:%S'),
+        'occurrences': alert.occurrences,
+        'isRead': bool(alert.is_read)
+    }
+
+def _page_size(default):
+    """The `limit` query argument, capped at MAX_PAGE_SIZE; raises ValueError below 1"""
+    limit = request.args.get('limit', default, type=int)
+    if limit < 1:
+        raise ValueError('limit must be at least 1')
+    return min(limit, MAX_PAGE_SIZE)
+
+def _keyset_cursor(timestamp, row_id):
+    return f"{timestamp.strftime('%Y-%m-%dT%H:%M:%S.%f')}_{row_id}"
+
+def _parse_keyset_cursor(cursor):
+    cursor_time, cursor_id = cursor.rsplit('_', 1)
+    return datetime.strptime(cursor_time, '%Y-%m-%dT%H:%M:%S.%f'), int(cursor_id)
 
 @app.route('/api/alerts', methods=['GET', 'POST'])
+@responses.cached('alerts')
 def handle_alerts():
-    """Get or create alerts"""
+    """Get a page of alerts, newest first, or create one"""
     if request.method == 'POST':
         try:
             data = request.json
-            alert = Alert(
-                message=data['message'],
-                location=data['location'],
-                is_read=data.get('is_read', False)
-            )
-            db.session.add(alert)
+            if data.get('is_read', False):
+                alert = Alert(message=data['message'], location=data['location'], is_read=True)
+                db.session.add(alert)
+                db.session.flush()
+                raised = [(alert, True)]
+            else:
+                raised = _raise_alerts([{'message': data['message'], 'location': data['location']}])
             db.session.commit()
+            _publish_alerts(raised)
             return jsonify({
                 'message': 'Alert created successfully',
-                'alert': {
-                    'id': alert.id,
-                    'message': alert.message,
-                    'location': alert.location,
-                    'timestamp': alert.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                    'isRead': alert.is_read
-                }
+                'alert': _serialize_alert(raised[0][0])
             })
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
-    else:
-        try:
-            alerts = Alert.query.order_by(Alert.timestamp.desc()).limit(10).all()
-            return jsonify([{
-                'id': alert.id,
-                'message': alert.message,
-                'location': alert.location,
-                'timestamp': alert.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                'isRead': alert.is_read
-            } for alert in alerts])
-        except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return _error_response(e)
+
+    try:
+        limit = _page_size(DEFAULT_ALERT_PAGE_SIZE)
+        query = Alert.query
+        location = request.args.get('location')
+        if location:
+            query = query.filter(Alert.location == location)
+        if request.args.get('unread') in ('1', 'true'):
+            query = query.filter(Alert.is_read == False)
+        cursor = request.args.get('cursor')
+        if cursor:
+            cursor_time, cursor_id = _parse_keyset_cursor(cursor)
+            query = query.filter(db.or_(
+                Alert.timestamp < cursor_time,
+                db.and_(Alert.timestamp == cursor_time, Alert.id < cursor_id)
+            ))
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        alerts = query.order_by(Alert.timestamp.desc(), Alert.id.desc()).limit(limit + 1).all()
+        response = jsonify([_serialize_alert(alert) for alert in alerts[:limit]])
+        # The body stays a plain list for existing clients; the next page is linked by header
+        if len(alerts) > limit:
+            response.headers['X-Next-Cursor'] = _keyset_cursor(alerts[limit - 1].timestamp, alerts[limit - 1].id)
+        return response
+    except Exception as e:
+        return _error_response(e)
+
+def _alert_selection(data):
+    """Filters for a bulk alert action: explicit ids, or location/before/unread, or all"""
+    if not isinstance(data, dict):
+        raise ValueError('Expected a JSON object')
+    if 'ids' in data:
+        ids = data['ids']
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            raise ValueError('Expected ids to be a list of integers')
+        return [Alert.id.in_(ids)] if ids else [literal(False)]
+    filters = []
+    if data.get('location'):
+        filters.append(Alert.location == data['location'])
+    if data.get('before'):
+        filters.append(Alert.timestamp < _parse_timestamp(data['before']))
+    if data.get('unread'):
+        filters.append(Alert.is_read == False)
+    if not filters and data.get('all') is not True:
+        raise ValueError('Expected ids, a location/before/unread filter, or all: true')
+    return filters
+
+def _alert_batches(filters):
+    """Yield ids of the selected alerts, oldest first, one committed batch at a time"""
+    last_id = 0
+    while True:
+        ids = db.session.execute(
+            db.select(Alert.id).where(*filters, Alert.id > last_id).order_by(Alert.id).limit(ALERT_BATCH_SIZE)
+        ).scalars().all()
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+@app.route('/api/alerts/dismiss', methods=['POST'])
+def dismiss_alerts():
+    """Delete many alerts"""
+    try:
+        filters = _alert_selection(request.get_json(silent=True) or {})
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        dismissed = 0
+        for ids in _alert_batches(filters):
+            db.session.execute(db.delete(Alert).where(Alert.id.in_(ids)))
+            db.session.commit()
+            dismissed += len(ids)
+            responses.invalidate('alerts')
+            events.publish('alert-dismissed', {'ids': ids})
+        return jsonify({'message': 'Alerts deleted successfully', 'dismissed': dismissed})
+    except Exception as e:
+        db.session.rollback()
+        return _error_response(e)
+
+@app.route('/api/alerts/acknowledge', methods=['POST'])
+def acknowledge_alerts():
+    """Mark many alerts as read"""
+    try:
+        filters = _alert_selection(request.get_json(silent=True) or {})
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        acknowledged = 0
+        for ids in _alert_batches(filters + [Alert.is_read == False]):
+            db.session.execute(db.update(Alert).where(Alert.id.in_(ids)).values(is_read=True))
+            db.session.commit()
+            acknowledged += len(ids)
+            responses.invalidate('alerts')
+            events.publish('alert-read', {'ids': ids})
+        return jsonify({'message': 'Alerts marked as read', 'acknowledged': acknowledged})
+    except Exception as e:
+        db.session.rollback()
+        return _error_response(e)
 
 @app.route('/api/alerts/<int:alert_id>/dismiss', methods=['POST'])
 def dismiss_alert(alert_id):
@@ -114,12 +926,15 @@ def dismiss_alert(alert_id):
         if alert:
             db.session.delete(alert)  # Delete instead of marking as read
             db.session.commit()
+            responses.invalidate('alerts')
+            events.publish('alert-dismissed', {'id': alert_id})
             return jsonify({'message': 'Alert deleted successfully'})
         return jsonify({'error': 'Alert not found'}), 404
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return _error_response(e)
 
 @app.route('/api/settings', methods=['GET', 'POST'])
+@responses.cached('settings')
 def handle_settings():
     """Get or update system settings"""
     if request.method == 'POST':
@@ -137,9 +952,11 @@ def handle_settings():
             settings.threshold_temperature = data['thresholds']['temperature']
             
             db.session.commit()
+            responses.invalidate('settings')
+            alert_engine.configure(settings.threshold_capacity, settings.threshold_temperature)
             return jsonify({'message': 'Settings saved successfully'})
         except Exception as e:
-            return jsonify({'error': str(e)}), 500
+            return _error_response(e)
     else:
         settings = Settings.query.first()
         if not settings:
@@ -163,28 +980,37 @@ def handle_settings():
 def reset_bin():
     """Reset the bin and archive current stats"""
     try:
-        # Get current measurements
-        latest_measurements = {}
-        start_time = None
-        max_temp = 0
-        
-        for waste_type in ['recyclable', 'organic', 'non-recyclable']:
-            measurements = WasteMeasurement.query\
-                .filter_by(waste_type=waste_type)\
-                .order_by(WasteMeasurement.timestamp.desc())\
-                .all()
-            
-            if measurements:
-                latest_measurements[waste_type] = measurements[0].fill_level
-                # Track earliest measurement time and max temperature
-                for m in measurements:
-                    # Ensure timestamp has timezone info
-                    measurement_time = m.timestamp.replace(tzinfo=timezone.utc) if m.timestamp.tzinfo is None else m.timestamp
-                    if start_time is None or measurement_time < start_time:
-                        start_time = measurement_time
-                    if m.temperature and m.temperature > max_temp:
-                        max_temp = m.temperature
+        # Measurements since the previous reset; older rows may still be waiting for the archiver
+        previous_watermark = db.session.query(func.max(BinReset.last_measurement_id)).scalar() or 0
+        watermark = db.session.query(func.max(WasteMeasurement.id)).scalar() or previous_watermark
+        cycle = [WasteMeasurement.id > previous_watermark, WasteMeasurement.id <= watermark]
+
+        # One grouped aggregate: first/last timestamp and max temperature per waste type,
+        # joined back to the rows holding each type's latest fill level
+        per_type = db.select(
+            WasteMeasurement.waste_type,
+            func.min(WasteMeasurement.timestamp).label('first_seen'),
+            func.max(WasteMeasurement.timestamp).label('last_seen'),
+            func.max(WasteMeasurement.temperature).label('max_temperature')
+        ).where(*cycle).group_by(WasteMeasurement.waste_type).subquery()
+        summary = db.session.execute(
+            db.select(
+                per_type.c.waste_type,
+                per_type.c.first_seen,
+                per_type.c.max_temperature,
+                WasteMeasurement.fill_level
+            ).join(WasteMeasurement, db.and_(
+                WasteMeasurement.waste_type == per_type.c.waste_type,
+                WasteMeasurement.timestamp == per_type.c.last_seen,
+                *cycle
+            )).order_by(WasteMeasurement.id)
+        ).all()
+
+        latest_measurements = {row.waste_type: row.fill_level for row in summary}
+        start_time = min((_as_utc(row.first_seen) for row in summary), default=None)
+        max_temp = max((row.max_temperature for row in summary if row.max_temperature), default=0)
 
+        hist_stats = None
         if latest_measurements:
             total = sum(latest_measurements.values())
             if total > 0:
@@ -198,9 +1024,6 @@ def reset_bin():
                 
                 # Calculate fill duration in hours
                 end_time = datetime.now(timezone.utc)
-                # Ensure start_time has timezone info
-                if start_time and start_time.tzinfo is None:
-                    start_time = start_time.replace(tzinfo=timezone.utc)
                 duration = (end_time - start_time).total_seconds() / 3600 if start_time else 0
 
                 # Save historical stats
@@ -213,34 +1036,189 @@ def reset_bin():
                     fill_duration_hours=duration
                 )
                 db.session.add(hist_stats)
+                db.session.flush()
+                _add_to_historical_aggregate(hist_stats)
 
-        # Clear current measurements
-        WasteMeasurement.query.delete()
+        # Measurements are moved to the archive in the background
+        db.session.add(BinReset(
+            last_measurement_id=watermark,
+            historical_stats_id=hist_stats.id if hist_stats else None
+        ))
         
         # Clear alerts
         Alert.query.delete()
         
         db.session.commit()
+        responses.invalidate('alerts', 'historical')
+        reset_time = datetime.now(timezone.utc)
+        bin_states.reset_fill(reset_time)
+        alert_engine.reset()
+        forecaster.reset()
+        archive_requested.set()
+        events.publish('bin-reset', {'timestamp': reset_time.strftime('%Y-%m-%d %H:%M:%S')})
         return jsonify({'message': 'Bin reset successfully'})
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        db.session.rollback()
+        return _error_response(e)
+
+def _add_to_historical_aggregate(record):
+    """Fold a new HistoricalStats row into the running sums in the current transaction"""
+    aggregate = HistoricalStatsAggregate
+    db.session.execute(db.update(aggregate).where(aggregate.id == 1).values(
+        cycle_count=aggregate.cycle_count + 1,
+        recyclable_sum=aggregate.recyclable_sum + record.recyclable_percentage,
+        organic_sum=aggregate.organic_sum + record.organic_percentage,
+        non_recyclable_sum=aggregate.non_recyclable_sum + record.non_recyclable_percentage,
+        efficiency_sum=aggregate.efficiency_sum + record.efficiency_score,
+        max_temperature_sum=aggregate.max_temperature_sum + (record.max_temperature or 0),
+        max_temperature_count=aggregate.max_temperature_count + (record.max_temperature is not None),
+        fill_duration_sum=aggregate.fill_duration_sum + (record.fill_duration_hours or 0),
+        fill_duration_count=aggregate.fill_duration_count + (record.fill_duration_hours is not None)
+    ))
+
+def rebuild_historical_aggregate():
+    """Create the running sums row from the full table if it does not exist yet"""
+    if db.session.get(HistoricalStatsAggregate, 1) is not None:
+        return
+    totals = db.session.query(
+        func.count(HistoricalStats.id),
+        func.sum(HistoricalStats.recyclable_percentage),
+        func.sum(HistoricalStats.organic_percentage),
+        func.sum(HistoricalStats.non_recyclable_percentage),
+        func.sum(HistoricalStats.efficiency_score),
+        func.sum(HistoricalStats.max_temperature),
+        func.count(HistoricalStats.max_temperature),
+        func.sum(HistoricalStats.fill_duration_hours),
+        func.count(HistoricalStats.fill_duration_hours)
+    ).one()
+    db.session.add(HistoricalStatsAggregate(
+        id=1,
+        cycle_count=totals[0],
+        recyclable_sum=totals[1] or 0,
+        organic_sum=totals[2] or 0,
+        non_recyclable_sum=totals[3] or 0,
+        efficiency_sum=totals[4] or 0,
+        max_temperature_sum=totals[5] or 0,
+        max_temperature_count=totals[6],
+        fill_duration_sum=totals[7] or 0,
+        fill_duration_count=totals[8]
+    ))
+    db.session.commit()
+
+def _archive_pending_resets():
+    """Move measurements covered by unarchived resets into the archive table, in chunks"""
+    for reset in BinReset.query.filter_by(archived=False).order_by(BinReset.id).all():
+        while True:
+            # Short transactions so ingestion never waits long for the write lock
+            chunk = db.select(WasteMeasurement.id)\
+                .where(WasteMeasurement.id <= reset.last_measurement_id)\
+                .order_by(WasteMeasurement.id)\
+                .limit(ARCHIVE_CHUNK_SIZE)\
+                .subquery()
+            chunk_end = db.session.execute(db.select(func.max(chunk.c.id))).scalar()
+            if chunk_end is None:
+                break
+            db.session.execute(insert(WasteMeasurementArchive).from_select(
+                ['id', 'bin_id', 'timestamp', 'fill_level', 'waste_type', 'temperature', 'reset_id'],
+                db.select(
+                    WasteMeasurement.id,
+                    WasteMeasurement.bin_id,
+                    WasteMeasurement.timestamp,
+                    WasteMeasurement.fill_level,
+                    WasteMeasurement.waste_type,
+                    WasteMeasurement.temperature,
+                    literal(reset.id)
+                ).where(WasteMeasurement.id <= chunk_end)
+            ))
+            db.session.execute(db.delete(WasteMeasurement).where(WasteMeasurement.id <= chunk_end))
+            db.session.commit()
+        reset.archived = True
+        db.session.commit()
+
+def _archive_worker():
+    while True:
+        archive_requested.wait()
+        archive_requested.clear()
+        with app.app_context():
+            try:
+                _archive_pending_resets()
+            except Exception as e:
+                db.session.rollback()
+                handler_errors.inc('archiver', type(e).__name__)
+                app.logger.exception('Archiving measurements failed')
+
+archive_requested = threading.Event()
+
+def _compact_alerts():
+    """Delete alerts past the retention period, oldest first, one short transaction per batch"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=app.config['ALERT_RETENTION_DAYS'])
+    deleted = 0
+    while True:
+        ids = db.session.execute(
+            db.select(Alert.id).where(Alert.timestamp < cutoff)
+            .order_by(Alert.timestamp, Alert.id).limit(ALERT_BATCH_SIZE)
+        ).scalars().all()
+        if not ids:
+            break
+        db.session.execute(db.delete(Alert).where(Alert.id.in_(ids)))
+        db.session.commit()
+        deleted += len(ids)
+        responses.invalidate('alerts')
+        events.publish('alert-dismissed', {'ids': ids})
+    return deleted
+
+def _alert_retention_worker():
+    while True:
+        with app.app_context():
+            try:
+                _compact_alerts()
+            except Exception as e:
+                db.session.rollback()
+                handler_errors.inc('alert-retention', type(e).__name__)
+                app.logger.exception('Alert retention failed')
+        time.sleep(ALERT_RETENTION_INTERVAL)
 
 @app.route('/api/historical-stats', methods=['GET'])
+@responses.cached('historical')
 def get_historical_stats():
-    """Get historical statistics"""
+    """Get a page of historical statistics, newest first, plus all-time averages"""
     try:
-        # Get all historical records
-        records = HistoricalStats.query.order_by(HistoricalStats.timestamp.desc()).all()
-        
-        # Calculate averages
-        averages = db.session.query(
-            func.avg(HistoricalStats.recyclable_percentage).label('avg_recyclable'),
-            func.avg(HistoricalStats.organic_percentage).label('avg_organic'),
-            func.avg(HistoricalStats.non_recyclable_percentage).label('avg_non_recyclable'),
-            func.avg(HistoricalStats.efficiency_score).label('avg_efficiency'),
-            func.avg(HistoricalStats.max_temperature).label('avg_max_temp'),
-            func.avg(HistoricalStats.fill_duration_hours).label('avg_duration')
-        ).first()
+        limit = _page_size(DEFAULT_PAGE_SIZE)
+        cursor = request.args.get('cursor')
+        start = request.args.get('start')
+        end = request.args.get('end')
+
+        query = HistoricalStats.query
+        if start:
+            query = query.filter(HistoricalStats.timestamp >= _parse_timestamp(start))
+        if end:
+            query = query.filter(HistoricalStats.timestamp < _parse_timestamp(end))
+        if cursor:
+            # Keyset pagination: continue strictly after the last (timestamp, id) returned
+            cursor_time, cursor_id = _parse_keyset_cursor(cursor)
+            query = query.filter(db.or_(
+                HistoricalStats.timestamp < cursor_time,
+                db.and_(HistoricalStats.timestamp == cursor_time, HistoricalStats.id < cursor_id)
+            ))
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        records = query.order_by(HistoricalStats.timestamp.desc(), HistoricalStats.id.desc())\
+            .limit(limit + 1)\
+            .all()
+        next_cursor = None
+        if len(records) > limit:
+            records = records[:limit]
+            last = records[-1]
+            next_cursor = _keyset_cursor(last.timestamp, last.id)
+
+        # Maintained by reset_bin, so averages cost one primary-key lookup
+        totals = db.session.get(HistoricalStatsAggregate, 1)
+        cycles = totals.cycle_count
+
+        def average(total, count):
+            return round(total / count, 1) if count else 0
 
         return jsonify({
             'history': [{
@@ -252,21 +1230,175 @@ def get_historical_stats():
                 'maxTemperature': round(record.max_temperature, 1),
                 'fillDuration': round(record.fill_duration_hours, 1)
             } for record in records],
+            'nextCursor': next_cursor,
             'averages': {
-                'recyclable': round(averages.avg_recyclable or 0, 1),
-                'organic': round(averages.avg_organic or 0, 1),
-                'nonRecyclable': round(averages.avg_non_recyclable or 0, 1),
-                'efficiency': round(averages.avg_efficiency or 0, 1),
-                'maxTemperature': round(averages.avg_max_temp or 0, 1),
-                'fillDuration': round(averages.avg_duration or 0, 1)
-            }
+                'recyclable': average(totals.recyclable_sum, cycles),
+                'organic': average(totals.organic_sum, cycles),
+                'nonRecyclable': average(totals.non_recyclable_sum, cycles),
+                'efficiency': average(totals.efficiency_sum, cycles),
+                'maxTemperature': average(totals.max_temperature_sum, totals.max_temperature_count),
+                'fillDuration': average(totals.fill_duration_sum, totals.fill_duration_count)
+            },
+            'cycles': cycles
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return _error_response(e)
+
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """Server-sent event stream of fill-level, alert and reset events"""
+    # Each open stream holds one server thread for its lifetime
+    bin_ids = request.args.get('bin_id')
+    subscription = events.subscribe(bin_ids.split(',') if bin_ids else None)
+    return Response(events.stream(subscription), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+EXPORT_TABLES = {
+    'measurements': WasteMeasurement,
+    'archived-measurements': WasteMeasurementArchive,
+    'alerts': Alert,
+    'historical': HistoricalStats
+}
+
+def _export_chunks(model, filters):
+    """Yield lists of row tuples, each read in its own short transaction keyed on id"""
+    columns = list(model.__table__.columns)
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            db.select(*columns)
+            .where(model.id > last_id, *filters)
+            .order_by(model.id)
+            .limit(EXPORT_CHUNK_SIZE)
+        ).all()
+        # End the read transaction between chunks so WAL checkpoints are never held back
+        db.session.rollback()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        yield [tuple(row) for row in rows]
+
+@app.route('/api/export', methods=['GET'])
+def export_data():
+    """Stream a table over an optional time range as CSV, NDJSON or Parquet"""
+    table = request.args.get('table', 'measurements')
+    format = request.args.get('format', 'csv')
+    model = EXPORT_TABLES.get(table)
+    if model is None:
+        return jsonify({'error': f"table must be one of {', '.join(EXPORT_TABLES)}"}), 400
+    if format not in export.available_formats():
+        return jsonify({'error': f"format must be one of {', '.join(export.available_formats())}"}), 400
+
+    filters = []
+    try:
+        if request.args.get('start'):
+            filters.append(model.timestamp >= _parse_timestamp(request.args['start']))
+        if request.args.get('end'):
+            filters.append(model.timestamp < _parse_timestamp(request.args['end']))
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    if request.args.get('bin_id') and hasattr(model, 'bin_id'):
+        filters.append(model.bin_id == request.args['bin_id'])
+
+    columns = model.__table__.columns
+    body = export.encode(
+        format,
+        [column.name for column in columns],
+        [column.type.python_type for column in columns],
+        _export_chunks(model, filters)
+    )
+    return Response(stream_with_context(body), mimetype=export.FORMATS[format], headers={
+        'Content-Disposition': f'attachment; filename=wastewise-{table}.{format}'
+    })
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/ingest/stats', methods=['GET'])
+def get_ingest_stats():
+    """Get write-behind queue depth and flush latency counters"""
+    if measurement_queue is None:
+        return jsonify({'writeBehind': False})
+    return jsonify({'writeBehind': True, **measurement_queue.stats()})
+
+@event.listens_for(Engine, 'connect')
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Use WAL so readers never block the writer and commits skip the full fsync"""
+    if dbapi_connection.__class__.__module__.startswith('sqlite3'):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.close()
+
+def upgrade_schema():
+    """Bring databases created by older versions up to the current models"""
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(db.engine.dialect)}'
+                if column.server_default is not None:
+                    default = column.server_default.arg
+                    default = default.text if hasattr(default, 'text') else f"'{default}'"
+                    ddl += f' DEFAULT {default}'
+                    if not column.nullable:
+                        ddl += ' NOT NULL'
+                conn.execute(text(ddl))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        _ensure_autoincrement(conn, WasteMeasurement.__table__)
+        # Unread filters compare is_read = 0 so they can use the index
+        conn.execute(db.update(Alert).where(Alert.is_read.is_(None)).values(is_read=False))
+
+        # Archived ids are gone from the live table, so make sure new ids start above them
+        archived_max = conn.execute(db.select(func.max(WasteMeasurementArchive.id))).scalar()
+        if archived_max is not None:
+            conn.execute(text(
+                "INSERT OR IGNORE INTO sqlite_sequence (name, seq) VALUES ('waste_measurement', 0)"
+            ))
+            conn.execute(text(
+                "UPDATE sqlite_sequence SET seq = MAX(seq, :archived_max) WHERE name = 'waste_measurement'"
+            ), {'archived_max': archived_max})
+
+def _ensure_autoincrement(conn, table):
+    """Rebuild a table created without AUTOINCREMENT, which SQLite cannot add in place"""
+    ddl = conn.execute(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"
+    ), {'name': table.name}).scalar()
+    if ddl is None or 'AUTOINCREMENT' in ddl.upper():
+        return
+    legacy = f'{table.name}_legacy'
+    columns = ', '.join(column.name for column in table.columns)
+    conn.execute(text(f'ALTER TABLE {table.name} RENAME TO {legacy}'))
+    for index in table.indexes:
+        conn.execute(text(f'DROP INDEX IF EXISTS {index.name}'))
+    table.create(conn)
+    conn.execute(text(f'INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {legacy}'))
+    conn.execute(text(f'DROP TABLE {legacy}'))
 
 # Create database tables
 with app.app_context():
     db.create_all()
+    upgrade_schema()
+    backfill_rollups()
+    rebuild_historical_aggregate()
+    warm_load_bin_states()
+    rebuild_forecasts()
+    load_alert_thresholds()
+
+# Finish archiving left over from a previous run, then wait for resets
+threading.Thread(target=_archive_worker, name='measurement-archiver', daemon=True).start()
+archive_requested.set()
+threading.Thread(target=_alert_retention_worker, name='alert-retention', daemon=True).start()
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
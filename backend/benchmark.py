@@ -0,0 +1,239 @@
+"""
+Load generator and benchmark for the WasteWise backend.
+
+Simulates a fleet of bins posting readings at the ESP32's 2 Hz cadence,
+dashboards polling the read endpoints, occasional alerts and bin resets,
+and reports throughput and p50/p95/p99 latency per route.
+
+    # In-process against a throwaway database seeded with 1M readings
+    python benchmark.py --bins 200 --duration 30 --seed-measurements 1000000
+
+    # Over HTTP against a running server
+    python benchmark.py --url http://localhost:5000 --bins 50 --dashboards 20
+"""
+import argparse
+import heapq
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+
+class LatencyRecorder:
+    """Collects per-route latencies and error counts from many worker threads"""
+
+    def __init__(self):
+        self._latencies = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, seconds, ok):
+        with self._lock:
+            self._latencies.setdefault(route, []).append(seconds)
+            if not ok:
+                self._errors[route] = self._errors.get(route, 0) + 1
+
+    def report(self, elapsed):
+        """Return {route: {count, rps, p50, p95, p99, max, errors}} with latencies in ms"""
+        with self._lock:
+            routes = {route: sorted(values) for route, values in self._latencies.items()}
+            errors = dict(self._errors)
+        summary = {}
+        for route, values in sorted(routes.items()):
+            summary[route] = {
+                'count': len(values),
+                'rps': len(values) / elapsed if elapsed else 0,
+                'p50': percentile(values, 50) * 1000,
+                'p95': percentile(values, 95) * 1000,
+                'p99': percentile(values, 99) * 1000,
+                'max': values[-1] * 1000,
+                'errors': errors.get(route, 0)
+            }
+        return summary
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+class InProcessClient:
+    """Drives the Flask app through its test client, skipping the network"""
+
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def request(self, method, path, payload=None):
+        response = self._client.open(path, method=method, json=payload)
+        return response.status_code
+
+
+class HttpClient:
+    """Drives a running server over HTTP with one keep-alive session per worker"""
+
+    def __init__(self, base_url):
+        import requests
+        self._base_url = base_url.rstrip('/')
+        self._session = requests.Session()
+
+    def request(self, method, path, payload=None):
+        response = self._session.request(method, self._base_url + path, json=payload)
+        return response.status_code
+
+
+def _reading(bin_id, fill_levels, rng):
+    fill_levels[bin_id] = min(100.0, fill_levels.get(bin_id, rng.uniform(0, 40)) + rng.uniform(0, 0.2))
+    return {
+        'bin_id': bin_id,
+        'fill_level': round(fill_levels[bin_id], 2),
+        'temperature': round(rng.gauss(72, 4), 1),
+        'timestamp': datetime.now(timezone.utc).isoformat()
+    }
+
+
+DASHBOARD_ROUTES = [
+    ('GET', '/api/current-stats'),
+    ('GET', '/api/alerts'),
+    ('GET', '/api/historical-stats'),
+    ('GET', '/api/bins'),
+    ('GET', '/api/measurements')
+]
+
+
+def _worker(client, tasks, args, recorder, deadline, seed):
+    """Run one worker's share of the simulated fleet until `deadline`"""
+    rng = random.Random(seed)
+    fill_levels = {}
+    pending = []  # readings buffered for the next batch request
+    heap = [(time.monotonic() + rng.uniform(0, interval), interval, kind, target)
+            for kind, target, interval in tasks]
+    heapq.heapify(heap)
+
+    while heap:
+        due, interval, kind, target = heapq.heappop(heap)
+        if due >= deadline:
+            break
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        if kind == 'reading':
+            reading = _reading(target, fill_levels, rng)
+            if args.batch_size > 1:
+                pending.append(reading)
+                if len(pending) < args.batch_size:
+                    heapq.heappush(heap, (due + interval, interval, kind, target))
+                    continue
+                method, path, payload = 'POST', '/api/measurements/batch', {'readings': pending}
+                pending = []
+            else:
+                method, path, payload = 'POST', '/api/current-stats', reading
+        elif kind == 'poll':
+            method, path = DASHBOARD_ROUTES[target % len(DASHBOARD_ROUTES)]
+            payload = None
+            target += 1
+        elif kind == 'alert':
+            method, path, payload = 'POST', '/api/alerts', {
+                'message': 'Benchmark alert', 'location': f'Building {rng.randint(1, 9)}'
+            }
+        else:
+            method, path, payload = 'POST', '/api/reset-bin', None
+
+        started = time.perf_counter()
+        try:
+            status = client.request(method, path, payload)
+            ok = status < 400 or status == 429
+        except Exception:
+            ok = False
+        recorder.record(f'{method} {path}', time.perf_counter() - started, ok)
+        # Fixed-rate schedule: if the server is slower than the fleet, the worker runs flat out
+        heapq.heappush(heap, (due + interval, interval, kind, target))
+
+
+def run_fleet(client_factory, args):
+    """Spread the simulated fleet over worker threads and collect latencies"""
+    tasks = [[] for _ in range(args.workers)]
+    for i in range(args.bins):
+        tasks[i % args.workers].append(('reading', f'bench-{i + 1}', 1 / args.reading_hz))
+    for i in range(args.dashboards):
+        tasks[i % args.workers].append(('poll', i, args.poll_interval))
+    if args.alert_interval > 0:
+        tasks[0].append(('alert', None, args.alert_interval))
+    if args.reset_interval > 0:
+        tasks[-1].append(('reset', None, args.reset_interval))
+
+    recorder = LatencyRecorder()
+    started = time.monotonic()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(target=_worker, args=(client_factory(), worker_tasks, args, recorder, deadline, i))
+        for i, worker_tasks in enumerate(tasks) if worker_tasks
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder.report(time.monotonic() - started), time.monotonic() - started
+
+
+def print_report(summary, elapsed):
+    total = sum(route['count'] for route in summary.values())
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.0f} req/s)\n")
+    print(f"{'route':<32}{'count':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'errors':>8}")
+    for route, stats in summary.items():
+        print(f"{route:<32}{stats['count']:>8}{stats['rps']:>9.1f}{stats['p50']:>9.2f}"
+              f"{stats['p95']:>9.2f}{stats['p99']:>9.2f}{stats['max']:>9.2f}{stats['errors']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the WasteWise backend under a simulated fleet')
+    parser.add_argument('--url', help='benchmark a running server over HTTP instead of in-process')
+    parser.add_argument('--database', help='SQLite file for in-process runs (default: a temporary file)')
+    parser.add_argument('--bins', type=int, default=50, help='simulated bins')
+    parser.add_argument('--reading-hz', type=float, default=2.0, help='readings per second per bin')
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help='readings per request; above 1 uses /api/measurements/batch')
+    parser.add_argument('--dashboards', type=int, default=5, help='simulated dashboard pollers')
+    parser.add_argument('--poll-interval', type=float, default=1.0, help='seconds between dashboard requests')
+    parser.add_argument('--alert-interval', type=float, default=10.0, help='seconds between posted alerts, 0 to disable')
+    parser.add_argument('--reset-interval', type=float, default=0.0, help='seconds between bin resets, 0 to disable')
+    parser.add_argument('--workers', type=int, default=8, help='client threads')
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds to run')
+    parser.add_argument('--seed-measurements', type=int, default=0, help='readings to seed before an in-process run')
+    parser.add_argument('--seed-historical', type=int, default=1000, help='historical records to seed with --seed-measurements')
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+
+    if args.url:
+        client_factory = lambda: HttpClient(args.url)
+    else:
+        # The app binds its database at import time, so point it at the benchmark database first
+        database = args.database or os.path.join(tempfile.mkdtemp(prefix='wastewise-bench-'), 'bench.db')
+        os.environ['WASTEWISE_DATABASE_URI'] = f'sqlite:///{os.path.abspath(database)}'
+        from app import app
+        if args.seed_measurements:
+            from app import rebuild_forecasts, warm_load_bin_states
+            from seed_data import seed_bulk
+            with app.app_context():
+                seed_bulk(args.seed_measurements, max(args.bins, 1), args.seed_historical)
+                # The app warm-loaded its in-memory state at import, before the seeded readings existed
+                warm_load_bin_states()
+                rebuild_forecasts()
+        print(f"In-process run against {database}")
+        client_factory = lambda: InProcessClient(app)
+
+    summary, elapsed = run_fleet(client_factory, args)
+    print_report(summary, elapsed)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'elapsed': elapsed, 'routes': summary, 'args': vars(args)}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import threading
+
+
+class BinStateRegistry:
+    """
+    Latest known state of every bin, keyed by bin id.
+
+    Each bin's state is an immutable-by-convention dict that is swapped in
+    whole on update, so readers never need a lock. Writers take one of
+    `stripes` locks chosen by bin id, so updates to different bins rarely
+    contend and an older reading can never overwrite a newer one.
+    """
+
+    def __init__(self, stripes=16):
+        self._stripes = [({}, threading.Lock()) for _ in range(stripes)]
+
+    def _stripe(self, bin_id):
+        return self._stripes[hash(bin_id) % len(self._stripes)]
+
+    def get(self, bin_id):
+        """Return the latest state of a bin, or None if it has never reported"""
+        states, _ = self._stripe(bin_id)
+        return states.get(bin_id)
+
+    def update(self, bin_id, fill_level, timestamp, waste_type=None, temperature=None, location=None):
+        """Record a reading unless a newer one is already known; returns the current state"""
+        states, lock = self._stripe(bin_id)
+        with lock:
+            previous = states.get(bin_id)
+            if previous is not None and previous['timestamp'] > timestamp:
+                return previous
+            state = {
+                'bin_id': bin_id,
+                'fill_level': fill_level,
+                'waste_type': waste_type,
+                'temperature': temperature,
+                'timestamp': timestamp,
+                'location': location if location is not None else (previous or {}).get('location')
+            }
+            states[bin_id] = state
+            return state
+
+    def reset_fill(self, timestamp):
+        """Mark every bin as emptied at `timestamp`"""
+        for states, lock in self._stripes:
+            with lock:
+                for bin_id, state in list(states.items()):
+                    states[bin_id] = {**state, 'fill_level': 0, 'timestamp': timestamp}
+
+    def snapshot(self, bin_ids=None, location=None, min_fill=None, max_fill=None):
+        """Return the states matching all given filters, ordered by bin id"""
+        if bin_ids is not None:
+            candidates = [state for state in map(self.get, bin_ids) if state is not None]
+        else:
+            candidates = []
+            for states, lock in self._stripes:
+                with lock:
+                    candidates.extend(states.values())
+
+        return sorted((
+            state for state in candidates
+            if (location is None or state['location'] == location)
+            and (min_fill is None or state['fill_level'] >= min_fill)
+            and (max_fill is None or state['fill_level'] <= max_fill)
+        ), key=lambda state: state['bin_id'])
+
+    def __len__(self):
+        return sum(len(states) for states, _ in self._stripes)
@@ -0,0 +1,62 @@
+import math
+import struct
+
+CONTENT_TYPE = 'application/vnd.wastewise.readings.v1'
+
+# One reading per 33-byte little-endian record, concatenated without framing:
+#   16s  bin id, ASCII, NUL-padded
+#   d    timestamp, epoch seconds
+#   f    fill level, percent
+#   f    temperature, Fahrenheit; NaN when the sensor has none
+#   B    waste type code, see WASTE_TYPE_CODES
+# serial_forwarder.py imports this module as backend.binary_format and sends
+# records built by `encode`.
+RECORD = struct.Struct('<16sdffB')
+MAX_BIN_ID_BYTES = 16  # longer bin ids cannot be sent in this format; use JSON
+
+WASTE_TYPE_CODES = {0: 'non-recyclable', 1: 'recyclable', 2: 'organic'}
+
+
+def decode(body):
+    """
+    Decode a buffer of records into reading dicts, unpacking straight out of
+    the request body without slicing it into per-record copies.
+    """
+    if len(body) % RECORD.size:
+        raise ValueError(f'Body length {len(body)} is not a multiple of the {RECORD.size}-byte record size')
+    readings = []
+    for bin_id, timestamp, fill_level, temperature, waste_code in RECORD.iter_unpack(memoryview(body)):
+        readings.append({
+            'bin_id': bin_id.rstrip(b'\0').decode('ascii', 'replace'),
+            'timestamp': timestamp,
+            # float32 on the wire; readings carry two decimals
+            'fill_level': round(fill_level, 2),
+            'temperature': None if math.isnan(temperature) else round(temperature, 2),
+            'waste_type': WASTE_TYPE_CODES.get(waste_code, waste_code)
+        })
+    return readings
+
+
+def encode_bin_id(bin_id):
+    """The bin id field's bytes; raises ValueError if it is not ASCII or does not fit"""
+    if not bin_id.isascii() or len(bin_id) > MAX_BIN_ID_BYTES:
+        raise ValueError(f"bin_id {bin_id!r} is not ASCII of at most {MAX_BIN_ID_BYTES} characters")
+    return bin_id.encode('ascii')
+
+
+def encode(readings):
+    """Encode reading dicts; the inverse of `decode`"""
+    codes = {name: code for code, name in WASTE_TYPE_CODES.items()}
+    buffer = bytearray(RECORD.size * len(readings))
+    for index, reading in enumerate(readings):
+        bin_id = encode_bin_id(reading['bin_id'])
+        temperature = reading.get('temperature')
+        RECORD.pack_into(
+            buffer, index * RECORD.size,
+            bin_id,
+            reading['timestamp'],
+            reading['fill_level'],
+            math.nan if temperature is None else temperature,
+            codes[reading.get('waste_type', 'non-recyclable')]
+        )
+    return bytes(buffer)
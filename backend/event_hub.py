@@ -0,0 +1,94 @@
+import json
+import queue
+import threading
+
+HEARTBEAT = b': heartbeat\n\n'
+RESYNC = b'event: resync\ndata: {}\n\n'
+
+
+def encode_event(event, data):
+    """Encode one server-sent event frame"""
+    return f'event: {event}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'.encode('utf-8')
+
+
+class Subscription:
+    """One connected client: an optional bin filter and a bounded queue of encoded frames"""
+
+    def __init__(self, bin_ids, max_pending):
+        self.bin_ids = bin_ids
+        self._frames = queue.Queue(maxsize=max_pending)
+
+    def wants(self, bin_id):
+        return bin_id is None or self.bin_ids is None or bin_id in self.bin_ids
+
+    def push(self, frame):
+        try:
+            self._frames.put_nowait(frame)
+        except queue.Full:
+            # A client this far behind would only replay stale state: drop the
+            # backlog and ask it to refetch everything instead
+            self._drain()
+            self._frames.put_nowait(RESYNC)
+
+    def next_frame(self, timeout):
+        try:
+            return self._frames.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _drain(self):
+        while True:
+            try:
+                self._frames.get_nowait()
+            except queue.Empty:
+                return
+
+
+class EventHub:
+    """
+    Fan-out of server-sent events. Each event is encoded once in `publish`
+    and the same bytes are queued for every interested subscriber, so the
+    cost of an event is proportional to the number of subscribers and not
+    to how often they would otherwise have polled.
+    """
+
+    def __init__(self, max_pending=256, heartbeat_interval=15.0):
+        self._max_pending = max_pending
+        self._heartbeat_interval = heartbeat_interval
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, bin_ids=None):
+        subscription = Subscription(frozenset(bin_ids) if bin_ids else None, self._max_pending)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event, data, bin_id=None):
+        """Send an event to every subscriber; events without a bin id go to everyone"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+        frame = encode_event(event, data)
+        for subscription in subscribers:
+            if subscription.wants(bin_id):
+                subscription.push(frame)
+
+    def stream(self, subscription, retry_ms=3000):
+        """Yield encoded frames for one subscriber, with heartbeats while idle"""
+        try:
+            yield f'retry: {retry_ms}\n\n'.encode('utf-8')
+            while True:
+                frame = subscription.next_frame(self._heartbeat_interval)
+                yield frame if frame is not None else HEARTBEAT
+        finally:
+            self.unsubscribe(subscription)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._subscribers)
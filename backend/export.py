@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet'
+}
+
+
+def available_formats():
+    return [name for name in FORMATS if name != 'parquet' or pa is not None]
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def csv_stream(columns, chunks):
+    """Encode row chunks as CSV, one yielded block per chunk"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode('utf-8')
+    for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_plain(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode('utf-8')
+
+
+def ndjson_stream(columns, chunks):
+    """Encode row chunks as newline-delimited JSON objects"""
+    for rows in chunks:
+        yield ''.join(
+            json.dumps(dict(zip(columns, map(_plain, row))), separators=(',', ':')) + '\n'
+            for row in rows
+        ).encode('utf-8')
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def _arrow_type(python_type):
+    return {
+        int: pa.int64(),
+        float: pa.float64(),
+        bool: pa.bool_(),
+        datetime: pa.timestamp('us')
+    }.get(python_type, pa.string())
+
+
+def parquet_stream(columns, python_types, chunks):
+    """Encode each row chunk as a Parquet row group, yielding bytes as they are written"""
+    if pa is None:
+        raise RuntimeError('Parquet export requires pyarrow')
+    schema = pa.schema([(name, _arrow_type(python_type)) for name, python_type in zip(columns, python_types)])
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(sink, schema)
+    for rows in chunks:
+        writer.write_table(pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)],
+            schema=schema
+        ))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def encode(format, columns, python_types, chunks):
+    """Stream `chunks` (lists of row tuples) in the given format"""
+    if format == 'csv':
+        return csv_stream(columns, chunks)
+    if format == 'ndjson':
+        return ndjson_stream(columns, chunks)
+    return parquet_stream(columns, python_types, chunks)
@@ -0,0 +1,157 @@
+import math
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # batch recompute falls back to replaying readings one by one
+    np = None
+
+
+class FillRateForecaster:
+    """
+    Per-bin fill rate and time-to-full from an exponentially weighted linear
+    regression of fill level over time.
+
+    Each bin keeps five weighted sums, so a reading costs O(1): older samples
+    are discounted with a `half_life_hours` half-life and the new one is
+    added. A drop of more than `empty_drop` points means the bin was emptied
+    and starts a new fill cycle. `fit_batch` computes the same sums for all
+    bins at once from history with NumPy.
+    """
+
+    def __init__(self, capacity=100.0, half_life_hours=6.0, empty_drop=20.0, min_samples=5,
+                 min_rate=0.01):
+        self._capacity = capacity
+        self._half_life = half_life_hours * 3600
+        self._empty_drop = empty_drop
+        self._min_samples = min_samples
+        self._min_rate = min_rate  # percent per hour; slower bins are treated as not filling
+        self._bins = {}
+        self._lock = threading.Lock()
+
+    def update(self, bin_id, timestamp, fill_level):
+        """Fold one reading (epoch seconds, percent) into the bin's regression"""
+        with self._lock:
+            state = self._bins.get(bin_id)
+            if state is None or fill_level < state['last_fill'] - self._empty_drop:
+                self._bins[bin_id] = self._new_state(timestamp, fill_level)
+                return
+            elapsed = timestamp - state['last_time']
+            if elapsed < 0:
+                return  # out-of-order reading; the regression only moves forward
+            decay = 0.5 ** (elapsed / self._half_life)
+            x = timestamp - state['origin']
+            state['w'] = state['w'] * decay + 1
+            state['sx'] = state['sx'] * decay + x
+            state['sy'] = state['sy'] * decay + fill_level
+            state['sxx'] = state['sxx'] * decay + x * x
+            state['sxy'] = state['sxy'] * decay + x * fill_level
+            state['samples'] += 1
+            state['last_time'] = timestamp
+            state['last_fill'] = fill_level
+
+    def reset(self):
+        """Forget every bin, e.g. after all bins were emptied"""
+        with self._lock:
+            self._bins.clear()
+
+    @staticmethod
+    def _new_state(timestamp, fill_level):
+        return {
+            'origin': timestamp, 'w': 1.0, 'sx': 0.0, 'sy': fill_level, 'sxx': 0.0, 'sxy': 0.0,
+            'samples': 1, 'last_time': timestamp, 'last_fill': fill_level
+        }
+
+    def fit_batch(self, bin_ids, timestamps, fill_levels):
+        """
+        Replace the model of every bin present in the inputs with one fitted
+        over its history. Inputs are parallel sequences of any order.
+        """
+        if np is None:
+            order = sorted(range(len(bin_ids)), key=lambda i: (bin_ids[i], timestamps[i]))
+            with self._lock:
+                for bin_id in set(bin_ids):
+                    self._bins.pop(bin_id, None)
+            for i in order:
+                self.update(bin_ids[i], timestamps[i], fill_levels[i])
+            return
+        if len(bin_ids) == 0:
+            return
+
+        names, bins = np.unique(np.asarray(bin_ids, dtype=object), return_inverse=True)
+        t = np.asarray(timestamps, dtype=np.float64)
+        y = np.asarray(fill_levels, dtype=np.float64)
+        order = np.lexsort((t, bins))
+        bins, t, y = bins[order], t[order], y[order]
+
+        # Split each bin's history into fill cycles at every emptying, keep the last cycle
+        new_bin = np.empty(len(bins), dtype=bool)
+        new_bin[0] = True
+        new_bin[1:] = bins[1:] != bins[:-1]
+        emptied = np.zeros(len(bins), dtype=bool)
+        emptied[1:] = y[1:] < y[:-1] - self._empty_drop
+        cycle = np.cumsum(new_bin | emptied)
+        last_index = np.r_[np.flatnonzero(new_bin)[1:] - 1, len(bins) - 1]
+        keep = cycle == cycle[last_index][bins]
+        bins, t, y = bins[keep], t[keep], y[keep]
+
+        first_index = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+        last_index = np.r_[first_index[1:] - 1, len(bins) - 1]
+        origin = t[first_index]
+        last_time = t[last_index]
+        x = t - origin[bins]
+        weights = 0.5 ** ((last_time[bins] - t) / self._half_life)
+
+        count = len(names)
+        sums = {
+            'w': np.bincount(bins, weights, count),
+            'sx': np.bincount(bins, weights * x, count),
+            'sy': np.bincount(bins, weights * y, count),
+            'sxx': np.bincount(bins, weights * x * x, count),
+            'sxy': np.bincount(bins, weights * x * y, count)
+        }
+        samples = np.bincount(bins, minlength=count)
+
+        with self._lock:
+            for i, bin_id in enumerate(names):
+                self._bins[bin_id] = {
+                    'origin': float(origin[i]),
+                    'w': float(sums['w'][i]),
+                    'sx': float(sums['sx'][i]),
+                    'sy': float(sums['sy'][i]),
+                    'sxx': float(sums['sxx'][i]),
+                    'sxy': float(sums['sxy'][i]),
+                    'samples': int(samples[i]),
+                    'last_time': float(last_time[i]),
+                    'last_fill': float(y[last_index[i]])
+                }
+
+    def _forecast(self, bin_id, state):
+        rate = None
+        denominator = state['w'] * state['sxx'] - state['sx'] ** 2
+        if state['samples'] >= self._min_samples and denominator > 1e-9:
+            rate = (state['w'] * state['sxy'] - state['sx'] * state['sy']) / denominator * 3600
+        seconds_to_full = None
+        if rate is not None and rate >= self._min_rate:
+            seconds_to_full = max(0.0, (self._capacity - state['last_fill']) / rate * 3600)
+        return {
+            'bin_id': bin_id,
+            'fill_level': state['last_fill'],
+            'fill_rate_per_hour': rate,
+            'hours_to_full': seconds_to_full / 3600 if seconds_to_full is not None else None,
+            'predicted_full_at': state['last_time'] + seconds_to_full if seconds_to_full is not None else None,
+            'last_reading_at': state['last_time'],
+            'samples': state['samples']
+        }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._bins)
+
+    def forecasts(self):
+        """All bins sorted by predicted time-to-full; bins that are not filling come last"""
+        with self._lock:
+            states = [(bin_id, dict(state)) for bin_id, state in self._bins.items()]
+        results = [self._forecast(bin_id, state) for bin_id, state in states]
+        results.sort(key=lambda f: (f['hours_to_full'] is None, f['hours_to_full'] or math.inf, f['bin_id']))
+        return results
@@ -0,0 +1,136 @@
+import bisect
+import threading
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _format_labels(labelnames, values):
+    if not labelnames:
+        return ''
+    pairs = []
+    for name, value in zip(labelnames, values):
+        escaped = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonically increasing count per label set"""
+
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield self.name, _format_labels(self.labelnames, labels), value
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set"""
+
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._buckets = tuple(buckets)
+        self._series = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self._buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def samples(self):
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        labelnames = self.labelnames + ('le',)
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self._buckets + ('+Inf',), values[:-1]):
+                cumulative += count
+                le = bound if bound == '+Inf' else _format_value(bound)
+                yield f'{self.name}_bucket', _format_labels(labelnames, labels + (le,)), cumulative
+            yield f'{self.name}_sum', _format_labels(self.labelnames, labels), values[-1]
+            yield f'{self.name}_count', _format_labels(self.labelnames, labels), cumulative
+
+
+class Gauge:
+    """Value read from a callback at scrape time; the callback may return a number or {labels: number}"""
+
+    type = 'gauge'
+
+    def __init__(self, name, documentation, read, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._read = read
+
+    def samples(self):
+        value = self._read()
+        if isinstance(value, dict):
+            for labels, sample in sorted(value.items()):
+                yield self.name, _format_labels(self.labelnames, labels), sample
+        elif value is not None:
+            yield self.name, '', value
+
+
+class CallbackCounter(Gauge):
+    """Monotonic total read from a callback at scrape time, for counts another component keeps"""
+
+    type = 'counter'
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, read, labelnames=()):
+        return self.register(Gauge(name, documentation, read, labelnames))
+
+    def counter_callback(self, name, documentation, read, labelnames=()):
+        return self.register(CallbackCounter(name, documentation, read, labelnames))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
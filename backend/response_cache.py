@@ -0,0 +1,80 @@
+import functools
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+
+from flask import Response, make_response, request
+
+
+class ResponseCache:
+    """
+    Cache of serialized GET responses, grouped into namespaces that write
+    paths invalidate explicitly.
+
+    Every namespace has a version counter. A response's ETag is derived from
+    the namespace version and the request path, so `If-None-Match` can be
+    answered with 304 from memory, without running the view. Entries are
+    tagged with the version they were computed under and are only served
+    while that version is current.
+    """
+
+    def __init__(self, max_entries=256):
+        self._max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (namespace, version, body, mimetype, headers)
+        self._versions = {}
+        self._lock = threading.Lock()
+        # Distinguishes ETags issued before and after a restart, when versions start over
+        self._boot = uuid.uuid4().hex[:8]
+
+    def invalidate(self, *namespaces):
+        """Bump the version of each namespace and drop its cached bodies"""
+        with self._lock:
+            for namespace in namespaces:
+                self._versions[namespace] = self._versions.get(namespace, 0) + 1
+            for key in [key for key, entry in self._entries.items() if entry[0] in namespaces]:
+                del self._entries[key]
+
+    def _etag(self, namespace, version, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=6).hexdigest()
+        return f'{self._boot}-{namespace}-{version}-{digest}'
+
+    def cached(self, namespace):
+        """Decorate a view so its GET responses are cached under `namespace`"""
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if request.method != 'GET':
+                    return view(*args, **kwargs)
+
+                key = request.full_path
+                with self._lock:
+                    version = self._versions.get(namespace, 0)
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        self._entries.move_to_end(key)
+                etag = self._etag(namespace, version, key)
+
+                if request.if_none_match.contains(etag):
+                    response = Response(status=304)
+                elif entry is not None and entry[1] == version:
+                    response = Response(entry[2], mimetype=entry[3], headers=entry[4])
+                else:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    with self._lock:
+                        # Only keep the body if no write invalidated it while the view ran
+                        if self._versions.get(namespace, 0) == version:
+                            headers = [(name, value) for name, value in response.headers
+                                       if name not in ('Content-Type', 'Content-Length')]
+                            self._entries[key] = (namespace, version, response.get_data(), response.mimetype, headers)
+                            self._entries.move_to_end(key)
+                            while len(self._entries) > self._max_entries:
+                                self._entries.popitem(last=False)
+
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = 'no-cache'
+                return response
+            return wrapper
+        return decorator
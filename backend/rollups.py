@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+# Rollup resolutions from finest to coarsest, with their bucket width
+RESOLUTIONS = {
+    'minute': timedelta(minutes=1),
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1)
+}
+
+# SQLite strftime() patterns producing the same text SQLAlchemy stores for a truncated DateTime
+SQLITE_BUCKET_FORMATS = {
+    'minute': '%Y-%m-%d %H:%M:00.000000',
+    'hour': '%Y-%m-%d %H:00:00.000000',
+    'day': '%Y-%m-%d 00:00:00.000000'
+}
+
+
+def truncate(timestamp, resolution):
+    """Return the start of the rollup bucket containing `timestamp`"""
+    if resolution == 'minute':
+        return timestamp.replace(second=0, microsecond=0)
+    if resolution == 'hour':
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if resolution == 'day':
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f'Unknown rollup resolution: {resolution}')
+
+
+def aggregate(rows):
+    """
+    Fold measurement rows into one partial rollup per (resolution, bin, bucket,
+    waste type), ready to be merged into the stored rollups with an upsert.
+    """
+    buckets = {}
+    for row in rows:
+        fill_level = row['fill_level']
+        temperature = row['temperature']
+        for resolution in RESOLUTIONS:
+            key = (resolution, row['bin_id'], truncate(row['timestamp'], resolution), row['waste_type'])
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = {
+                    'resolution': key[0],
+                    'bin_id': key[1],
+                    'bucket': key[2],
+                    'waste_type': key[3],
+                    'sample_count': 1,
+                    'fill_min': fill_level,
+                    'fill_max': fill_level,
+                    'fill_sum': fill_level,
+                    'max_temperature': temperature
+                }
+                continue
+            bucket['sample_count'] += 1
+            bucket['fill_min'] = min(bucket['fill_min'], fill_level)
+            bucket['fill_max'] = max(bucket['fill_max'], fill_level)
+            bucket['fill_sum'] += fill_level
+            if temperature is not None and (bucket['max_temperature'] is None or temperature > bucket['max_temperature']):
+                bucket['max_temperature'] = temperature
+    return list(buckets.values())
+
+
+def choose_resolution(span, max_points, raw_count):
+    """
+    Pick the finest resolution that answers a query over `span` in at most
+    `max_points` points per series: raw rows if there are few enough, otherwise
+    the first rollup whose bucket count fits, falling back to daily rollups.
+    """
+    if raw_count <= max_points:
+        return 'raw'
+    for resolution, width in RESOLUTIONS.items():
+        if span / width <= max_points:
+            return resolution
+    return 'day'
@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+
+import pytest
+
+# The app creates its schema at import, so point it at a throwaway database first
+os.environ['WASTEWISE_DATABASE_URI'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db')
+
+import app as wastewise
+import binary_format
+
+
+@pytest.fixture
+def client():
+    return wastewise.app.test_client()
+
+
+def post_batch(client, readings):
+    # json.dumps writes NaN/Infinity literals, which is what a misbehaving sensor would send
+    return client.post('/api/measurements/batch', data=json.dumps(readings), content_type='application/json')
+
+
+def test_huge_integer_temperature_rejects_only_that_reading(client):
+    response = post_batch(client, [
+        {'bin_id': 'overflow-1', 'fill_level': 10, 'temperature': 10 ** 400},
+        {'bin_id': 'overflow-1', 'fill_level': 20, 'temperature': 70}
+    ])
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['accepted'] == 1
+    assert body['results'][0] == {'index': 0, 'status': 'error', 'error': 'temperature is out of range'}
+    assert body['results'][1]['status'] == 'ok'
+
+
+@pytest.mark.parametrize('field, value', [
+    ('temperature', float('nan')),
+    ('temperature', float('inf')),
+    ('temperature', float('-inf')),
+    ('fill_level', float('nan')),
+    ('fill_level', float('inf'))
+])
+def test_non_finite_json_values_are_rejected(client, field, value):
+    reading = {'bin_id': 'finite-json', 'fill_level': 50, 'temperature': 70, field: value}
+    body = post_batch(client, [reading]).get_json()
+    assert body['accepted'] == 0
+    assert body['results'][0]['status'] == 'error'
+
+    response = client.post('/api/current-stats', data=json.dumps(reading), content_type='application/json')
+    assert response.status_code == 400
+
+
+def test_non_finite_binary_values_are_rejected(client):
+    records = binary_format.encode([
+        {'bin_id': 'finite-bin', 'timestamp': 1.7e9, 'fill_level': 40.0, 'temperature': float('inf')},
+        {'bin_id': 'finite-bin', 'timestamp': 1.7e9, 'fill_level': float('nan')},
+        {'bin_id': 'finite-bin', 'timestamp': 1.7e9, 'fill_level': 40.0, 'temperature': 71.0}
+    ])
+    response = client.post('/api/measurements/batch', data=records, content_type=binary_format.CONTENT_TYPE)
+    body = response.get_json()
+    assert [result['status'] for result in body['results']] == ['error', 'error', 'ok']
+
+    # Nothing non-finite reaches the bin state, so responses stay valid JSON
+    bins = client.get('/api/bins?bin_id=finite-bin')
+    assert 'Infinity' not in bins.get_data(as_text=True)
+    assert 'NaN' not in bins.get_data(as_text=True)
@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+from collections import deque
+
+
+class WriteBehindQueue:
+    """
+    Bounded in-memory queue drained by a background thread that hands items
+    to `flush` in groups, either when `batch_size` items are waiting or when
+    the oldest waiting item is `flush_interval` seconds old.
+
+    A group whose flush raises is retried up to `max_retries` more times,
+    waiting `retry_backoff` seconds before the first retry and twice as long
+    before each one after, and only counted as dropped once those run out.
+    """
+
+    def __init__(self, flush, max_size=10000, batch_size=500, flush_interval=0.25, max_retries=3,
+                 retry_backoff=0.5, logger=None):
+        self._flush = flush
+        self._max_size = max_size
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_retries = max_retries
+        self._retry_backoff = retry_backoff
+        self._logger = logger or logging.getLogger(__name__)
+        self._items = deque()
+        self._retry = None  # (batch, attempt, monotonic time it may be retried) after a failed flush
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+        # Counters, guarded by self._cond
+        self._enqueued = 0
+        self._rejected = 0
+        self._flushed = 0
+        self._dropped = 0
+        self._flushes = 0
+        self._failed_flushes = 0
+        self._retries = 0
+        self._flush_seconds_total = 0.0
+        self._flush_seconds_last = 0.0
+        self._flush_seconds_max = 0.0
+
+    def start(self):
+        """Start the flusher thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='write-behind-flusher', daemon=True)
+            self._thread.start()
+        return self
+
+    def offer(self, item):
+        """Enqueue an item; returns False when the queue is full or closed"""
+        with self._cond:
+            if self._closed or len(self._items) >= self._max_size:
+                self._rejected += 1
+                return False
+            self._items.append(item)
+            self._enqueued += 1
+            if len(self._items) == 1 or len(self._items) >= self._batch_size:
+                self._cond.notify()
+            return True
+
+    def stop(self, timeout=10.0):
+        """Stop accepting items, flush everything still queued and join the thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        else:
+            # Never started: drain synchronously so nothing is lost
+            while self._items or self._retry is not None:
+                if self._retry is not None:
+                    batch, attempt, retry_at = self._retry
+                    self._retry = None
+                    time.sleep(max(0.0, retry_at - time.monotonic()))
+                else:
+                    batch, attempt = self._take_batch(), 1
+                self._flush_batch(batch, attempt)
+
+    def stats(self):
+        """Snapshot of queue depth and flush counters"""
+        with self._cond:
+            return {
+                'depth': len(self._items) + (len(self._retry[0]) if self._retry is not None else 0),
+                'capacity': self._max_size,
+                'enqueued': self._enqueued,
+                'rejected': self._rejected,
+                'flushed': self._flushed,
+                'dropped': self._dropped,
+                'flushes': self._flushes,
+                'failedFlushes': self._failed_flushes,
+                'retries': self._retries,
+                'flushSecondsTotal': self._flush_seconds_total,
+                'flushSecondsLast': self._flush_seconds_last,
+                'flushSecondsMax': self._flush_seconds_max
+            }
+
+    def _take_batch(self):
+        count = min(len(self._items), self._batch_size)
+        return [self._items.popleft() for _ in range(count)]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._retry is not None:
+                    # Back off before trying a failed group again; new items keep queueing behind it
+                    batch, attempt, retry_at = self._retry
+                    remaining = retry_at - time.monotonic()
+                    while remaining > 0:
+                        self._cond.wait(remaining)
+                        remaining = retry_at - time.monotonic()
+                    self._retry = None
+                else:
+                    while not self._items and not self._closed:
+                        self._cond.wait()
+                    if not self._items and self._closed:
+                        return
+                    # Give the group a short window to fill up before committing
+                    deadline = time.monotonic() + self._flush_interval
+                    while len(self._items) < self._batch_size and not self._closed:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    batch, attempt = self._take_batch(), 1
+            self._flush_batch(batch, attempt)
+
+    def _flush_batch(self, batch, attempt=1):
+        retry = attempt <= self._max_retries
+        started = time.perf_counter()
+        try:
+            self._flush(batch)
+            failed = False
+        except Exception:
+            if retry:
+                self._logger.warning('Write-behind flush of %d items failed (attempt %d), retrying',
+                                     len(batch), attempt, exc_info=True)
+            else:
+                self._logger.exception('Write-behind flush of %d items failed %d times, dropping them',
+                                       len(batch), attempt)
+            failed = True
+        elapsed = time.perf_counter() - started
+
+        with self._cond:
+            self._flushes += 1
+            self._flush_seconds_total += elapsed
+            self._flush_seconds_last = elapsed
+            self._flush_seconds_max = max(self._flush_seconds_max, elapsed)
+            if failed:
+                self._failed_flushes += 1
+                if retry:
+                    self._retries += 1
+                    backoff = self._retry_backoff * 2 ** (attempt - 1)
+                    self._retry = (batch, attempt + 1, time.monotonic() + backoff)
+                else:
+                    self._dropped += len(batch)
+            else:
+                self._flushed += len(batch)
@@ -0,0 +1,154 @@
+"""
+Compare classifier inference variants against the eager fp32 model.
+
+Each variant (eager, TorchScript, ONNX, with and without dynamic int8
+quantization) is timed on single crops for latency and on full batches for
+throughput. Given a held-out folder with one subdirectory per class, it also
+reports top-1 accuracy, the change from fp32, and how often the variant agrees
+with fp32 on each crop.
+
+    python benchmark_inference.py --checkpoint best_model_efficientnet_v2_s.pth --held-out images_val
+    python benchmark_inference.py --variants eager torchscript+quant --iterations 10
+"""
+import argparse
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+import torch
+
+from inference_engine import (InferenceEngine, build_classifier, label_manifest_path, load_classification_model,
+                              load_label_manifest, load_label_mapping)
+from sources import IMAGE_EXTENSIONS
+
+VARIANTS = ('eager', 'torchscript', 'torchscript+quant', 'onnx', 'onnx+quant')
+
+
+def read_held_out(root, idx_to_label, limit=None):
+    """BGR crops and their class indexes from a folder laid out like the training images"""
+    label_to_idx = {label: i for i, label in idx_to_label.items()}
+    crops, targets = [], []
+    for label in sorted(label_to_idx):
+        directory = os.path.join(root, label)
+        if not os.path.isdir(directory):
+            continue
+        names = sorted(n for n in os.listdir(directory) if n.lower().endswith(IMAGE_EXTENSIONS))
+        for name in names[:limit]:
+            image = cv2.imread(os.path.join(directory, name))
+            if image is not None:
+                crops.append(image)
+                targets.append(label_to_idx[label])
+    return crops, targets
+
+
+def synthetic_crops(count, seed=0):
+    """Deposit-sized random crops, for timing when there is no held-out folder"""
+    rng = np.random.default_rng(seed)
+    return [
+        rng.integers(0, 256, size=(rng.integers(80, 300), rng.integers(80, 300), 3), dtype=np.uint8)
+        for _ in range(count)
+    ]
+
+
+def build_model(checkpoint, num_classes, device):
+    if checkpoint:
+        return load_classification_model(checkpoint, num_classes, device)
+    return build_classifier(num_classes).to(device).eval()
+
+
+def load_labels(labels, checkpoint, num_classes):
+    """Class names from a manifest or training image folder, the checkpoint's manifest, `images`, or numbers"""
+    if labels is None and checkpoint and os.path.exists(label_manifest_path(checkpoint)):
+        labels = label_manifest_path(checkpoint)
+    if labels is None and os.path.isdir('images'):
+        labels = 'images'
+    if labels is None:
+        return {i: str(i) for i in range(num_classes)}
+    return load_label_mapping(labels) if os.path.isdir(labels) else load_label_manifest(labels)
+
+
+def percentile(samples, q):
+    return float(np.percentile(samples, q)) * 1000 if samples else 0.0
+
+
+def time_variant(engine, crops, iterations, batch_size):
+    latencies = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        engine.classify([crops[i % len(crops)]])
+        latencies.append(time.perf_counter() - started)
+    batch = [crops[i % len(crops)] for i in range(batch_size)]
+    started = time.perf_counter()
+    for _ in range(max(1, iterations // batch_size)):
+        engine.classify(batch)
+    elapsed = time.perf_counter() - started
+    return {
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'crops_per_sec': max(1, iterations // batch_size) * batch_size / elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark classifier inference variants against eager fp32')
+    parser.add_argument('--checkpoint', help='fine-tuned weights; random weights if omitted')
+    parser.add_argument('--labels', help='label manifest or training image folder (default: the manifest next to '
+                                         '--checkpoint, else images/)')
+    parser.add_argument('--num-classes', type=int, default=30, help='class count when there are no labels at all')
+    parser.add_argument('--held-out', help='folder of held-out crops, one subdirectory per class')
+    parser.add_argument('--per-class', type=int, help='use at most this many held-out crops per class')
+    parser.add_argument('--variants', nargs='+', choices=VARIANTS, default=list(VARIANTS))
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--iterations', type=int, default=50, help='single-crop timings per variant')
+    parser.add_argument('--threads', type=int, help='torch CPU threads')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    device = torch.device('cpu')
+    idx_to_label = load_labels(args.labels, args.checkpoint, args.num_classes)
+    if not args.checkpoint:
+        print('No --checkpoint given: using random weights, so accuracy figures are meaningless')
+
+    crops, targets = read_held_out(args.held_out, idx_to_label, args.per_class) if args.held_out else ([], [])
+    timing_crops = crops or synthetic_crops(32)
+
+    model = build_model(args.checkpoint, len(idx_to_label), device)
+    reference = None
+    results = []
+    print(f"{'variant':<20}{'p50 ms':>9}{'p95 ms':>9}{'crops/s':>9}{'top-1':>8}{'delta':>8}{'agree':>8}")
+    for variant in ['eager'] + [v for v in args.variants if v != 'eager']:
+        backend, _, quant = variant.partition('+')
+        try:
+            engine = InferenceEngine(model, idx_to_label, device, backend=backend, quantize=bool(quant),
+                                     max_batch=args.batch_size)
+        except (RuntimeError, ValueError) as e:
+            # e.g. onnxruntime missing, or a TorchScript checkpoint on another backend
+            print(f"{variant}: skipped ({e})")
+            continue
+        if not results and variant != 'eager':
+            print(f"(eager fp32 unavailable: accuracy deltas and agreement are against {variant})")
+        r = {'variant': variant, **time_variant(engine, timing_crops, args.iterations, args.batch_size)}
+        if crops:
+            predictions = engine.logits(crops).argmax(dim=1)
+            if reference is None:
+                reference = predictions
+            r['accuracy'] = (predictions == torch.tensor(targets)).float().mean().item()
+            r['agreement'] = (predictions == reference).float().mean().item()
+            r['accuracy_delta'] = r['accuracy'] - results[0]['accuracy'] if results else 0.0
+        results.append(r)
+        accuracy = (f"{r['accuracy']:>8.1%}{r['accuracy_delta']:>+8.1%}{r['agreement']:>8.1%}"
+                    if crops else f"{'-':>8}{'-':>8}{'-':>8}")
+        print(f"{variant:<20}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['crops_per_sec']:>9.1f}{accuracy}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'checkpoint': args.checkpoint, 'held_out': args.held_out, 'crops': len(crops),
+                       'batch_size': args.batch_size, 'variants': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
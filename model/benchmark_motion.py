@@ -0,0 +1,128 @@
+"""
+Compare the tiered motion detector with the original full-resolution one.
+
+Each clip is decoded into memory first, so only detection is timed, then run
+through both detectors with timestamps taken from the clip's frame rate.
+Reports frames/sec for each, how often they agree on whether a frame has
+motion, and how many deposits they both found.
+
+    python benchmark_motion.py clips/deposit_01.mp4 clips/deposit_02/ --json motion.json
+    python benchmark_motion.py --synthetic
+"""
+import argparse
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from deposit_detector import DepositDetector
+from sources import read_clip
+
+
+def synthetic_clip(idle=90, falling=20, settled=90, size=(480, 640), seed=0):
+    """An idle bin, an item falling in, and the item lying still, with sensor noise"""
+    rng = np.random.default_rng(seed)
+    background = cv2.GaussianBlur(rng.integers(60, 120, size=(*size, 3), dtype=np.uint8), (9, 9), 0)
+    frames = []
+    for i in range(idle + falling + settled):
+        frame = background.copy()
+        if i >= idle:
+            top = 20 + min(i - idle, falling - 1) * 12
+            cv2.rectangle(frame, (250, top), (330, top + 80), (30, 200, 240), -1)
+        noise = rng.integers(-3, 4, size=frame.shape, dtype=np.int16)
+        frames.append(np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8))
+    return frames, 30.0
+
+
+def run(detector, frames, fps):
+    """Per-frame motion flags, deposits as (frame index, box), and frames/sec"""
+    motion = []
+    deposits = []
+    started = time.perf_counter()
+    for index, frame in enumerate(frames):
+        result = detector.process(frame, index / fps)
+        # A skipped frame keeps the previous frame's verdict
+        motion.append(motion[-1] if result.skipped and motion else bool(result.motion_boxes))
+        if result.deposit is not None:
+            deposits.append((index, result.deposit))
+    elapsed = time.perf_counter() - started
+    return motion, deposits, len(frames) / elapsed if elapsed else 0.0
+
+
+def iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    width = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    height = max(0, min(ay + ah, by + bh) - max(ay, by))
+    intersection = width * height
+    union = aw * ah + bw * bh - intersection
+    return intersection / union if union else 0.0
+
+
+def matched_deposits(reference, candidate, max_frames, min_iou=0.3):
+    """Count reference deposits found by the candidate within `max_frames` frames and overlapping boxes"""
+    unmatched = list(candidate)
+    matched = 0
+    for frame_index, box in reference:
+        for other in unmatched:
+            if abs(other[0] - frame_index) <= max_frames and iou(other[1], box) >= min_iou:
+                unmatched.remove(other)
+                matched += 1
+                break
+    return matched
+
+
+def compare(name, frames, fps, detector_options):
+    baseline_motion, baseline_deposits, baseline_fps = run(DepositDetector.full_resolution(), frames, fps)
+    tiered_motion, tiered_deposits, tiered_fps = run(DepositDetector(**detector_options), frames, fps)
+    agreement = sum(a == b for a, b in zip(baseline_motion, tiered_motion)) / len(frames)
+    return {
+        'clip': name,
+        'frames': len(frames),
+        'baseline_fps': baseline_fps,
+        'tiered_fps': tiered_fps,
+        'speedup': tiered_fps / baseline_fps if baseline_fps else None,
+        'motion_agreement': agreement,
+        'baseline_deposits': len(baseline_deposits),
+        'tiered_deposits': len(tiered_deposits),
+        'matched_deposits': matched_deposits(baseline_deposits, tiered_deposits, max_frames=int(fps))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark tiered motion detection against the full-resolution path')
+    parser.add_argument('clips', nargs='*', help='video files or directories of frame images')
+    parser.add_argument('--synthetic', action='store_true', help='also run a generated deposit clip')
+    parser.add_argument('--flow-scale', type=float, default=0.5)
+    parser.add_argument('--gate-width', type=int, default=160)
+    parser.add_argument('--max-idle-skip', type=int, default=3)
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+    if not args.clips and not args.synthetic:
+        parser.error('give at least one clip or --synthetic')
+
+    options = {'flow_scale': args.flow_scale, 'gate_width': args.gate_width, 'max_idle_skip': args.max_idle_skip}
+    clips = [(path, *read_clip(path)) for path in args.clips]
+    if args.synthetic:
+        clips.append(('synthetic', *synthetic_clip()))
+
+    results = []
+    print(f"{'clip':<32}{'frames':>8}{'base fps':>10}{'tiered fps':>12}{'speedup':>9}{'motion agree':>14}{'deposits':>14}")
+    for name, frames, fps in clips:
+        if not frames:
+            print(f"{name}: no frames, skipped")
+            continue
+        r = compare(name, frames, fps, options)
+        results.append(r)
+        print(f"{os.path.basename(name.rstrip('/')):<32}{r['frames']:>8}{r['baseline_fps']:>10.1f}"
+              f"{r['tiered_fps']:>12.1f}{r['speedup']:>8.1f}x{r['motion_agreement']:>13.1%}"
+              f"{r['matched_deposits']:>6}/{r['baseline_deposits']} ({r['tiered_deposits']})")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'options': options, 'clips': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+from dataclasses import dataclass, field
+
+import cv2
+import numpy as np
+
+
+@dataclass
+class DetectionResult:
+    """What the detector saw in one frame"""
+    motion_boxes: list = field(default_factory=list)  # (x, y, w, h) of moving regions
+    deposit: tuple = None  # (x, y, w, h) of a newly registered deposit, if any
+    motion_mask: np.ndarray = None
+    fg_mask: np.ndarray = None
+    flow_magnitude: np.ndarray = None  # at flow resolution, in full-frame pixels
+    flow_angle: np.ndarray = None
+    gate_fired: bool = False  # whether the frame-difference gate let optical flow run
+    skipped: bool = False  # frame skipped while idle; nothing was computed
+
+
+class DepositDetector:
+    """
+    Finds items dropped into the bin, one frame at a time.
+
+    Motion is detected in tiers. A frame difference on a copy downscaled to
+    `gate_width` pixels runs first; only when enough of it changed does dense
+    optical flow run, at `flow_scale` of the full resolution, with boxes
+    mapped back to full-frame coordinates. After `idle_frames` quiet frames
+    the detector looks at only every `max_idle_skip`-th frame until the
+    gate fires again. Once motion has settled for `settle_duration` seconds,
+    KNN background subtraction looks for a new object, which is registered
+    as a deposit after it shows up in `detection_required_frames`
+    consecutive frames away from any earlier deposit. Timestamps come from
+    the caller so recorded footage replays with its own timing.
+
+    `DepositDetector.full_resolution()` builds the original single-tier
+    detector: full-frame flow on every frame.
+    """
+
+    def __init__(self, motion_threshold=5.0, min_contour_area=500, settle_duration=1.0,
+                 detection_required_frames=3, motion_gate=True, gate_width=160, gate_threshold=25,
+                 gate_fraction=0.002, flow_scale=0.5, idle_frames=30, max_idle_skip=3):
+        self.motion_threshold = motion_threshold  # Minimum flow magnitude (in pixels) for motion.
+        self.min_contour_area = min_contour_area  # Minimum contour area to consider as valid motion.
+        self.settle_duration = settle_duration  # Seconds to wait for motion to settle.
+        self.detection_required_frames = detection_required_frames
+        self.motion_gate = motion_gate
+        self.gate_width = gate_width
+        self.gate_threshold = gate_threshold  # Grey-level change that counts a gate pixel as changed
+        self.gate_fraction = gate_fraction  # Share of changed gate pixels that lets optical flow run
+        self.flow_scale = flow_scale
+        self.idle_frames = idle_frames
+        self.max_idle_skip = max_idle_skip
+        self._prev_small = None
+        self._prev_flow_input = None  # blurred, downscaled previous frame, if already computed
+        self._quiet_frames = 0
+        self._frame_count = 0
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+        # You can tune the parameters such as history and dist2Threshold for your application.
+        self._bg_subtractor = cv2.createBackgroundSubtractorKNN(history=500, dist2Threshold=400.0,
+                                                                detectShadows=False)
+        self._prev_gray = None
+        self._fg_mask = None
+        self._consecutive_detection_frames = 0
+        self._deposit_in_progress = False
+        self._last_motion_time = None
+        self.previous_deposits = []  # Bounding boxes of registered deposits
+
+    @classmethod
+    def full_resolution(cls, **kwargs):
+        """The original detector: full-frame optical flow on every frame, no gate, no skipping"""
+        return cls(motion_gate=False, flow_scale=1.0, max_idle_skip=1, **kwargs)
+
+    def process(self, frame, timestamp):
+        """Run motion and deposit detection on a BGR frame taken at `timestamp` (seconds)"""
+        self._frame_count += 1
+        idle = self._quiet_frames >= self.idle_frames and not self._deposit_in_progress
+        if idle and self.max_idle_skip > 1 and self._frame_count % self.max_idle_skip:
+            return DetectionResult(fg_mask=self._fg_mask, skipped=True)
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self._prev_gray is None:
+            # The first frame is the baseline for optical flow
+            self._prev_gray = gray
+            self._prev_small = self._gate_input(gray)
+            self._fg_mask = np.zeros_like(gray)
+            return DetectionResult(fg_mask=self._fg_mask)
+
+        result = self._detect_motion(gray)
+        self._quiet_frames = 0 if result.gate_fired else self._quiet_frames + 1
+        if result.motion_boxes:
+            self._deposit_in_progress = True
+            self._last_motion_time = timestamp
+            # Reset the deposit detection counter when motion is ongoing.
+            self._consecutive_detection_frames = 0
+        elif (self._deposit_in_progress and self._last_motion_time is not None
+              and timestamp - self._last_motion_time > self.settle_duration):
+            result.deposit = self._detect_deposit(gray)
+            if result.deposit is not None:
+                self._deposit_in_progress = False
+                self._consecutive_detection_frames = 0
+        result.fg_mask = self._fg_mask
+        self._prev_gray = gray
+        return result
+
+    def _gate_input(self, gray):
+        height, width = gray.shape
+        size = (self.gate_width, max(1, round(height * self.gate_width / width)))
+        return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+    def _flow_input(self, gray):
+        if self.flow_scale != 1.0:
+            gray = cv2.resize(gray, None, fx=self.flow_scale, fy=self.flow_scale, interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def _detect_motion(self, gray):
+        if self.motion_gate:
+            small = self._gate_input(gray)
+            _, changed = cv2.threshold(cv2.absdiff(small, self._prev_small), self.gate_threshold, 255,
+                                       cv2.THRESH_BINARY)
+            self._prev_small = small
+            if cv2.countNonZero(changed) < self.gate_fraction * changed.size:
+                self._prev_flow_input = None
+                return DetectionResult()
+
+        prev_flow_input = self._prev_flow_input
+        if prev_flow_input is None:
+            prev_flow_input = self._flow_input(self._prev_gray)
+        flow_input = self._flow_input(gray)
+        self._prev_flow_input = flow_input
+        flow = cv2.calcOpticalFlowFarneback(
+            prev_flow_input, flow_input, None,
+            pyr_scale=0.5,
+            levels=3,
+            winsize=max(5, round(25 * self.flow_scale) | 1),
+            iterations=5,
+            poly_n=7,
+            poly_sigma=1.5,
+            flags=0
+        )
+        mag, ang = cv2.cartToPolar(flow[..., 0], flow[..., 1])
+        mag /= self.flow_scale  # in full-frame pixels, so thresholds mean the same at any scale
+
+        # Adaptive thresholding for motion detection.
+        motion_threshold_adaptive = np.mean(mag) + 2 * np.std(mag)
+        motion_mask = np.uint8((mag > max(self.motion_threshold, motion_threshold_adaptive)) * 255)
+        motion_mask = cv2.morphologyEx(motion_mask, cv2.MORPH_CLOSE, self._kernel)
+        motion_mask = cv2.morphologyEx(motion_mask, cv2.MORPH_OPEN, self._kernel)
+
+        contours, _ = cv2.findContours(motion_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        min_area = self.min_contour_area * self.flow_scale ** 2
+        boxes = [
+            tuple(round(v / self.flow_scale) for v in cv2.boundingRect(c))
+            for c in contours if cv2.contourArea(c) > min_area
+        ]
+        return DetectionResult(motion_boxes=boxes, motion_mask=motion_mask, flow_magnitude=mag,
+                               flow_angle=ang, gate_fired=True)
+
+    def _detect_deposit(self, gray):
+        """KNN background subtraction once motion has settled; returns a new deposit's box or None"""
+        fg_mask = self._bg_subtractor.apply(gray)
+        if fg_mask is None or fg_mask.size == 0:
+            print("Warning: fg_mask is invalid, skipping processing.")
+            return None
+        fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_OPEN, self._kernel)
+        self._fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_CLOSE, self._kernel)
+
+        contours, _ = cv2.findContours(self._fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        for cnt in contours:
+            if cv2.contourArea(cnt) <= self.min_contour_area:
+                continue
+            x, y, w, h = cv2.boundingRect(cnt)
+            # Check against previous deposits to avoid repeated registration.
+            collision_detected = any(
+                abs(px - x) < w and abs(py - y) < h for (px, py, pw, ph) in self.previous_deposits
+            )
+            if collision_detected:
+                # Reset the counter if the contour collides with a previous deposit.
+                self._consecutive_detection_frames = 0
+                continue
+            self._consecutive_detection_frames += 1
+            # Only register the deposit after several consecutive frames.
+            if self._consecutive_detection_frames >= self.detection_required_frames:
+                self.previous_deposits.append((x, y, w, h))
+                return (x, y, w, h)
+        return None
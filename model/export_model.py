@@ -0,0 +1,48 @@
+"""
+Prepare a fine-tuned checkpoint for fast, offline startup.
+
+Writes the class names from the training image folder to a label manifest
+next to the checkpoint, so the inference script no longer scans `images`.
+With --scripted it also writes a frozen TorchScript module (optionally with
+a dynamically quantized head) that loads without building the model in
+Python, plus a manifest next to it.
+
+    python export_model.py best_model_efficientnet_v2_s.pth
+    python export_model.py best_model_efficientnet_v2_s.pth --scripted classifier.pt --quantize
+"""
+import argparse
+import time
+
+import torch
+import torch.nn as nn
+
+from inference_engine import (label_manifest_path, load_classification_model, load_label_mapping,
+                              save_label_manifest, script_classifier)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write the label manifest and an optional TorchScript classifier')
+    parser.add_argument('checkpoint', help='fine-tuned state dict')
+    parser.add_argument('--images', default='images', help='training image folder, one subdirectory per class')
+    parser.add_argument('--scripted', help='also write a frozen TorchScript module to this path')
+    parser.add_argument('--quantize', action='store_true', help='dynamically quantize the scripted model head')
+    args = parser.parse_args()
+
+    idx_to_label = load_label_mapping(args.images)
+    manifest = label_manifest_path(args.checkpoint)
+    save_label_manifest(idx_to_label, manifest)
+    print(f"Wrote {len(idx_to_label)} labels to {manifest}")
+    if not args.scripted:
+        return
+
+    model = load_classification_model(args.checkpoint, len(idx_to_label), torch.device('cpu'))
+    if args.quantize:
+        model = torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+    started = time.perf_counter()
+    torch.jit.save(script_classifier(model), args.scripted)
+    save_label_manifest(idx_to_label, label_manifest_path(args.scripted))
+    print(f"Wrote TorchScript model to {args.scripted} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+import json
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+import torch
+import torch.nn as nn
+from torchvision import models
+from torchvision.transforms import functional as F
+
+BACKENDS = ('eager', 'torchscript', 'onnx')
+
+# EfficientNet_V2_S_Weights.IMAGENET1K_V1.transforms(): resize the short side and
+# centre-crop to 384, then normalize with the ImageNet statistics
+IMAGE_SIZE = 384
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+
+
+# ---------- Classification Model Setup ----------
+def build_classifier(num_classes):
+    """
+    Builds the bare EfficientNetV2-S architecture with a `num_classes` classifier head.
+    No pretrained weights are fetched; the fine-tuned checkpoint supplies all of them.
+    """
+    # model = models.mobilenet_v3_small(weights=None)
+    model = models.efficientnet_v2_s(weights=None)
+    in_features = model.classifier[-1].in_features
+    model.classifier[-1] = nn.Linear(in_features, num_classes)
+    return model
+
+
+def is_torchscript(model_path):
+    """Whether the file is a serialized TorchScript module rather than a state dict"""
+    if not zipfile.is_zipfile(model_path):
+        return False
+    with zipfile.ZipFile(model_path) as archive:
+        return any('/code/' in name for name in archive.namelist())
+
+
+def load_classification_model(model_path, num_classes, device):
+    """
+    Loads the fine-tuned classifier onto the specified device, without network access.
+
+    A state dict is memory-mapped and assigned into the bare architecture, so only the
+    pages actually touched are read. A TorchScript file written by export_model.py is
+    loaded as is, with no Python model to build.
+    """
+    if is_torchscript(model_path):
+        model = torch.jit.load(model_path, map_location=device)
+    else:
+        model = build_classifier(num_classes)
+        state_dict = torch.load(model_path, map_location=device, mmap=True, weights_only=True)
+        model.load_state_dict(state_dict, assign=True)
+        model.to(device)
+    model.eval()
+    return model
+
+
+def script_classifier(model, channels_last=True):
+    """Trace and freeze the model into a self-contained TorchScript module"""
+    example = torch.zeros(1, 3, IMAGE_SIZE, IMAGE_SIZE, device=next(model.parameters()).device)
+    if channels_last:
+        model = model.to(memory_format=torch.channels_last)
+        example = example.contiguous(memory_format=torch.channels_last)
+    with torch.inference_mode():
+        traced = torch.jit.trace(model.eval(), example)
+    return torch.jit.freeze(traced.eval())
+
+
+def label_manifest_path(model_path):
+    """Where the class names for a checkpoint live: next to it, as <name>.labels.json"""
+    return os.path.splitext(model_path)[0] + '.labels.json'
+
+
+def save_label_manifest(idx_to_label, path):
+    with open(path, 'w') as f:
+        json.dump({'labels': [idx_to_label[i] for i in range(len(idx_to_label))]}, f, indent=2)
+
+
+def load_label_manifest(path):
+    """Mapping from class index to label, as written by save_label_manifest"""
+    with open(path) as f:
+        return dict(enumerate(json.load(f)['labels']))
+
+
+def load_label_mapping(data_root='images'):
+    """
+    Scans the given data_root directory for subdirectories (categories) and returns
+    a mapping from class index to label.
+    """
+    categories = sorted([
+        d for d in os.listdir(data_root)
+        if os.path.isdir(os.path.join(data_root, d))
+    ])
+    label_to_idx = {category: i for i, category in enumerate(categories)}
+    idx_to_label = {i: category for category, i in label_to_idx.items()}
+    return idx_to_label
+
+
+class InferenceEngine:
+    """
+    Classifies batches of deposit crops with the fine-tuned model.
+
+    Crops are preprocessed as tensor operations (BGR to RGB, resize, centre
+    crop, normalize) and stacked into one channels-last batch, so N pending
+    crops cost one forward pass. Inference runs under
+    `torch.inference_mode`. `backend` selects how the model runs:
+
+    - 'eager': the PyTorch module itself
+    - 'torchscript': traced, frozen and optimized for inference
+    - 'onnx': exported to ONNX and run with onnxruntime, if installed
+
+    `quantize` applies dynamic int8 quantization: to the Linear layers for
+    the PyTorch backends, and to the exported graph for ONNX. A model loaded
+    from a TorchScript file was already traced, and quantized if requested,
+    by export_model.py, so it only runs on the 'torchscript' backend. The
+    engine runs `warmup` batches of `max_batch` crops at load time so the
+    first real deposit doesn't pay for lazy initialization.
+    """
+
+    def __init__(self, model, idx_to_label, device, backend='eager', quantize=False, channels_last=True,
+                 max_batch=8, warmup=2, onnx_path=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {', '.join(BACKENDS)}")
+        scripted = isinstance(model, torch.jit.ScriptModule)
+        if scripted and (backend != 'torchscript' or quantize):
+            raise ValueError("A TorchScript model runs on the 'torchscript' backend only, as exported")
+        self.idx_to_label = idx_to_label
+        self.backend = backend
+        self.quantize = quantize
+        self.max_batch = max_batch
+        self._device = device
+        self._channels_last = channels_last and backend != 'onnx'
+        self._mean = torch.tensor(IMAGENET_MEAN, device=device).view(1, 3, 1, 1)
+        self._std = torch.tensor(IMAGENET_STD, device=device).view(1, 3, 1, 1)
+
+        model = model.eval()
+        if scripted:
+            self._forward = torch.jit.optimize_for_inference(model)
+            self.warmup(warmup)
+            return
+        if quantize and backend != 'onnx':
+            # Dynamic quantization runs on CPU only
+            model = torch.ao.quantization.quantize_dynamic(model.cpu(), {nn.Linear}, dtype=torch.qint8)
+            self._device = device = torch.device('cpu')
+            self._mean, self._std = self._mean.cpu(), self._std.cpu()
+        if self._channels_last:
+            model = model.to(memory_format=torch.channels_last)
+
+        if backend == 'eager':
+            self._forward = model
+        elif backend == 'torchscript':
+            self._forward = torch.jit.optimize_for_inference(script_classifier(model, self._channels_last))
+        else:
+            example = torch.zeros(1, 3, IMAGE_SIZE, IMAGE_SIZE, device=device)
+            self._forward = self._load_onnx(model, example, onnx_path)
+
+        self.warmup(warmup)
+
+    def _load_onnx(self, model, example, onnx_path):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise RuntimeError('The onnx backend requires onnxruntime')
+        if onnx_path is None:
+            onnx_path = os.path.join(tempfile.mkdtemp(prefix='wastewise-onnx-'), 'classifier.onnx')
+        if not os.path.exists(onnx_path):
+            torch.onnx.export(
+                model, (example,), onnx_path,
+                input_names=['input'], output_names=['logits'],
+                dynamic_axes={'input': {0: 'batch'}, 'logits': {0: 'batch'}},
+                dynamo=False
+            )
+        if self.quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantized_path = onnx_path.replace('.onnx', '.int8.onnx')
+            if not os.path.exists(quantized_path):
+                quantize_dynamic(onnx_path, quantized_path, weight_type=QuantType.QInt8)
+            onnx_path = quantized_path
+        session = onnxruntime.InferenceSession(onnx_path, providers=['CPUExecutionProvider'])
+
+        def forward(batch):
+            logits = session.run(None, {'input': batch.cpu().numpy()})[0]
+            return torch.from_numpy(logits)
+        return forward
+
+    def preprocess(self, rois):
+        """Turn BGR uint8 crops of any size into one normalized (N, 3, 384, 384) batch"""
+        crops = []
+        for roi in rois:
+            image = torch.from_numpy(np.ascontiguousarray(roi[..., ::-1])).to(self._device)  # BGR -> RGB
+            image = image.permute(2, 0, 1)
+            image = F.resize(image, [IMAGE_SIZE], interpolation=F.InterpolationMode.BILINEAR, antialias=True)
+            crops.append(F.center_crop(image, [IMAGE_SIZE, IMAGE_SIZE]))
+        batch = torch.stack(crops).float().div_(255).sub_(self._mean).div_(self._std)
+        if self._channels_last:
+            batch = batch.contiguous(memory_format=torch.channels_last)
+        return batch
+
+    def logits(self, rois):
+        """Raw model outputs for the crops, `max_batch` at a time"""
+        outputs = []
+        with torch.inference_mode():
+            for start in range(0, len(rois), self.max_batch):
+                outputs.append(self._forward(self.preprocess(rois[start:start + self.max_batch])).float())
+        return torch.cat(outputs)
+
+    def classify(self, rois):
+        """Labels for a list of BGR crops"""
+        if not rois:
+            return []
+        predictions = self.logits(rois).argmax(dim=1).tolist()
+        return [self.idx_to_label.get(pred, "Unknown") for pred in predictions]
+
+    def warmup(self, iterations):
+        crops = [np.zeros((IMAGE_SIZE, IMAGE_SIZE, 3), dtype=np.uint8)] * self.max_batch
+        for _ in range(iterations):
+            self.logits(crops)
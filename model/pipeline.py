@@ -0,0 +1,265 @@
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+
+class LatestSlot:
+    """
+    Single-item hand-off where a new item replaces one nobody has taken yet,
+    so a slow consumer always gets the freshest frame instead of a backlog.
+    """
+
+    def __init__(self):
+        self._item = None
+        self._has_item = False
+        self._condition = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._condition:
+            if self._has_item:
+                self.dropped += 1
+            self._item = item
+            self._has_item = True
+            self._condition.notify()
+
+    def get(self, timeout=None):
+        """Take the item, waiting up to `timeout` seconds; raises queue.Empty if none arrived"""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._has_item, timeout):
+                raise queue.Empty
+            self._has_item = False
+            item, self._item = self._item, None
+            return item
+
+    def qsize(self):
+        return int(self._has_item)
+
+
+class StageStats:
+    """Items per second over a sliding window, plus totals, for one pipeline stage"""
+
+    def __init__(self, window=5.0):
+        self._window = window
+        self._times = deque()
+        self._busy = 0.0
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def record(self, busy_seconds):
+        now = time.monotonic()
+        with self._lock:
+            self.processed += 1
+            self._busy += busy_seconds
+            self._times.append(now)
+            while self._times and self._times[0] < now - self._window:
+                self._times.popleft()
+
+    def drop(self, count=1):
+        """Count items discarded before this stage could take them"""
+        with self._lock:
+            self.dropped += count
+
+    def fail(self, count=1):
+        """Count items this stage took but could not process"""
+        with self._lock:
+            self.failed += count
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._times and self._times[0] < now - self._window:
+                self._times.popleft()
+            recent = len(self._times)
+            return {
+                'fps': recent / self._window,
+                'processed': self.processed,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'avg_ms': self._busy / self.processed * 1000 if self.processed else 0.0
+            }
+
+
+@dataclass
+class Frame:
+    index: int
+    timestamp: float
+    image: object
+
+
+@dataclass
+class Deposit:
+    frame_index: int
+    timestamp: float
+    box: tuple
+    roi: object
+    label: str = None
+
+
+class DepositPipeline:
+    """
+    Capture, detection and classification on separate threads.
+
+    The capture thread reads frames as fast as the source produces them into
+    a latest-wins slot, so detection never works through a stale backlog and
+    the camera is never blocked. The detection thread runs `detector` on each
+    frame it takes and queues the crop of every new deposit; a pool of
+    `workers` threads takes up to `batch_size` pending crops at a time and
+    classifies them with `classify(rois) -> labels`. A full classification
+    queue drops the crop rather than stalling detection. Detection results
+    for display are published to another latest-wins slot, and classified
+    deposits to the `deposits` queue.
+
+    Recorded footage is replayed by passing its frame rate as `replay_fps`:
+    frames are stamped with their position in the clip instead of the wall
+    clock, and no frame or crop is dropped, so every run over the same clip
+    sees the same frames with the same timing however fast it goes.
+    """
+
+    def __init__(self, read_frame, detector, classify, workers=2, batch_size=8, classify_queue_size=16,
+                 replay_fps=None):
+        self._read_frame = read_frame  # () -> (ok, image), e.g. cv2.VideoCapture.read
+        self._detector = detector
+        self._classify = classify
+        self._workers = workers
+        self._batch_size = batch_size
+        self._replay_fps = replay_fps
+        self._frames = LatestSlot() if replay_fps is None else queue.Queue(maxsize=4)
+        self.detections = LatestSlot()  # (Frame, DetectionResult) for display
+        self._rois = queue.Queue(maxsize=classify_queue_size)
+        self.deposits = queue.Queue()  # classified Deposit objects
+        self._stopping = threading.Event()
+        self.finished = threading.Event()  # set once the source runs out and all stages drained
+        self._stats = {name: StageStats() for name in ('capture', 'detection', 'classification')}
+        self._threads = []
+        self._running_workers = workers
+        self._workers_lock = threading.Lock()
+
+    def start(self):
+        self._threads = [
+            threading.Thread(target=self._capture, name='capture', daemon=True),
+            threading.Thread(target=self._detect, name='detection', daemon=True)
+        ] + [
+            threading.Thread(target=self._classify_worker, name=f'classifier-{i}', daemon=True)
+            for i in range(self._workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _put(self, q, item):
+        """Blocking put on a bounded queue that gives up once stop() is called; returns whether it went in"""
+        while not self._stopping.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _capture(self):
+        index = 0
+        while not self._stopping.is_set():
+            started = time.perf_counter()
+            ok, image = self._read_frame()
+            if not ok:
+                break
+            self._stats['capture'].record(time.perf_counter() - started)
+            if self._replay_fps is None:
+                self._frames.put(Frame(index, time.time(), image))
+            elif not self._put(self._frames, Frame(index, index / self._replay_fps, image)):
+                return
+            index += 1
+        # End of stream
+        if self._replay_fps is None:
+            self._frames.put(None)
+        else:
+            self._put(self._frames, None)
+
+    def _detect(self):
+        while not self._stopping.is_set():
+            try:
+                frame = self._frames.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if frame is None:
+                break
+            started = time.perf_counter()
+            result = self._detector.process(frame.image, frame.timestamp)
+            if result.deposit is not None:
+                x, y, w, h = result.deposit
+                deposit = Deposit(frame.index, frame.timestamp, result.deposit, frame.image[y:y + h, x:x + w].copy())
+                if self._replay_fps is not None:
+                    self._put(self._rois, deposit)
+                else:
+                    try:
+                        self._rois.put_nowait(deposit)
+                    except queue.Full:
+                        self._stats['classification'].drop()
+                        print(f"Classification queue full, dropped deposit at ({x}, {y})")
+            self._stats['detection'].record(time.perf_counter() - started)
+            self.detections.put((frame, result))
+        for _ in range(self._workers):
+            self._put(self._rois, None)
+
+    def _classify_worker(self):
+        try:
+            end_of_stream = False
+            while not end_of_stream:
+                try:
+                    deposit = self._rois.get(timeout=0.5)
+                except queue.Empty:
+                    if self._stopping.is_set():
+                        break
+                    continue
+                # Take whatever else is already waiting, up to a full batch
+                batch = []
+                while deposit is not None:
+                    batch.append(deposit)
+                    if len(batch) == self._batch_size:
+                        break
+                    try:
+                        deposit = self._rois.get_nowait()
+                    except queue.Empty:
+                        break
+                end_of_stream = deposit is None
+                if batch:
+                    self._classify_batch(batch)
+        finally:
+            with self._workers_lock:
+                self._running_workers -= 1
+                if self._running_workers == 0:
+                    self.finished.set()
+
+    def _classify_batch(self, batch):
+        started = time.perf_counter()
+        try:
+            labels = self._classify([deposit.roi for deposit in batch])
+        except Exception as e:
+            # One bad batch must not take the worker, and every deposit after it, down
+            self._stats['classification'].fail(len(batch))
+            print(f"Classification failed for {len(batch)} deposit(s): {e!r}")
+            return
+        elapsed = time.perf_counter() - started
+        for deposit, label in zip(batch, labels):
+            deposit.label = label
+            self._stats['classification'].record(elapsed / len(batch))
+            self.deposits.put(deposit)
+
+    def stats(self):
+        """Per-stage FPS, totals, average time per item and depth of the queue it feeds"""
+        stats = {name: stage.snapshot() for name, stage in self._stats.items()}
+        stats['capture']['dropped'] = getattr(self._frames, 'dropped', 0)  # frames replaced before detection took them
+        stats['capture']['queue_depth'] = self._frames.qsize()
+        stats['detection']['queue_depth'] = self._rois.qsize()
+        stats['classification']['queue_depth'] = self.deposits.qsize()
+        return stats
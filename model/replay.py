@@ -0,0 +1,142 @@
+"""
+Replay recorded deposit clips through the full pipeline as fast as it runs.
+
+Each clip (a video file or a directory of frame images) goes through capture,
+detection and classification exactly as from the camera, but headless, with
+frames stamped by their position in the clip and none dropped, so runs over
+the same corpus are comparable. Reports overall frames/sec, average time per
+item in each stage and the deposits found. Without --model, crops are not
+classified and only detection is exercised.
+
+    python replay.py clips/*.mp4 clips/deposit_03/ --model best_model_efficientnet_v2_s.pth --json run.json
+    python replay.py clips/*.mp4 --compare run.json
+    python replay.py --synthetic
+"""
+import argparse
+import json
+import os
+import queue
+import time
+
+import torch
+
+from benchmark_motion import synthetic_clip
+from deposit_detector import DepositDetector
+from inference_engine import (BACKENDS, InferenceEngine, label_manifest_path, load_classification_model,
+                              load_label_manifest)
+from pipeline import DepositPipeline
+from sources import VideoSource
+
+
+def frame_reader(frames):
+    """cv2.VideoCapture.read-style reader over frames already in memory"""
+    frames = iter(frames)
+
+    def read():
+        image = next(frames, None)
+        return image is not None, image
+    return read
+
+
+def load_engine(args):
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    idx_to_label = load_label_manifest(args.labels or label_manifest_path(args.model))
+    model = load_classification_model(args.model, len(idx_to_label), device)
+    backend = args.backend or ('torchscript' if isinstance(model, torch.jit.ScriptModule) else 'eager')
+    return InferenceEngine(model, idx_to_label, device, backend=backend, quantize=args.quantize,
+                           max_batch=args.batch_size)
+
+
+def replay(name, read_frame, fps, classify, args):
+    """Run one clip to the end; returns its summary and deposits"""
+    pipeline = DepositPipeline(read_frame, DepositDetector(), classify, workers=args.workers,
+                               batch_size=args.batch_size, replay_fps=fps)
+    started = time.perf_counter()
+    pipeline.start()
+    deposits = []
+    while not pipeline.finished.is_set() or not pipeline.deposits.empty():
+        try:
+            deposits.append(pipeline.deposits.get(timeout=0.1))
+        except queue.Empty:
+            continue
+    elapsed = time.perf_counter() - started
+    pipeline.stop()
+    stats = pipeline.stats()
+    frames = stats['detection']['processed']
+    deposits.sort(key=lambda deposit: deposit.frame_index)
+    return {
+        'clip': name,
+        'frames': frames,
+        'seconds': elapsed,
+        'fps': frames / elapsed if elapsed else 0.0,
+        'stage_ms': {stage: s['avg_ms'] for stage, s in stats.items()},
+        'classification_failed': stats['classification']['failed'],
+        'deposits': [
+            {'frame': d.frame_index, 'time': d.timestamp, 'box': list(d.box), 'label': d.label}
+            for d in deposits
+        ]
+    }
+
+
+def compare(result, previous):
+    """One line on how a clip's speed and deposits changed since an earlier run"""
+    before = {(d['frame'], d['label']) for d in previous['deposits']}
+    after = {(d['frame'], d['label']) for d in result['deposits']}
+    change = result['fps'] / previous['fps'] - 1 if previous['fps'] else 0.0
+    return (f"  vs previous: {previous['fps']:.1f} -> {result['fps']:.1f} fps ({change:+.1%}), "
+            f"deposits {len(before)} -> {len(after)}, new {sorted(after - before)}, gone {sorted(before - after)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded clips through the deposit pipeline')
+    parser.add_argument('clips', nargs='*', help='video files or directories of frame images')
+    parser.add_argument('--synthetic', action='store_true', help='also replay a generated deposit clip')
+    parser.add_argument('--model', help='fine-tuned state dict or TorchScript file; detection only if omitted')
+    parser.add_argument('--labels', help='label manifest (default: <model>.labels.json next to the model)')
+    parser.add_argument('--backend', choices=BACKENDS)
+    parser.add_argument('--quantize', action='store_true')
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('--compare', help='results file from an earlier run to compare against')
+    args = parser.parse_args()
+    if not args.clips and not args.synthetic:
+        parser.error('give at least one clip or --synthetic')
+
+    if args.model:
+        classify = load_engine(args).classify
+    else:
+        classify = lambda rois: [None] * len(rois)
+    previous = {}
+    if args.compare:
+        with open(args.compare) as f:
+            previous = {r['clip']: r for r in json.load(f)['clips']}
+
+    results = []
+    print(f"{'clip':<32}{'frames':>8}{'fps':>9}{'capture ms':>12}{'detect ms':>11}{'classify ms':>13}{'deposits':>10}")
+    for name in args.clips + (['synthetic'] if args.synthetic else []):
+        if name == 'synthetic':
+            frames, fps = synthetic_clip()
+            r = replay(name, frame_reader(frames), fps, classify, args)
+        else:
+            source = VideoSource(name)
+            r = replay(name, source.read, source.fps, classify, args)
+            source.release()
+        results.append(r)
+        ms = r['stage_ms']
+        print(f"{os.path.basename(name.rstrip('/')):<32}{r['frames']:>8}{r['fps']:>9.1f}{ms['capture']:>12.2f}"
+              f"{ms['detection']:>11.2f}{ms['classification']:>13.2f}{len(r['deposits']):>10}")
+        if r['classification_failed']:
+            print(f"  {r['classification_failed']} deposit(s) failed classification")
+        for d in r['deposits']:
+            print(f"  frame {d['frame']} ({d['time']:.2f}s) at {tuple(d['box'])}: {d['label']}")
+        if name in previous:
+            print(compare(r, previous[name]))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'model': args.model, 'backend': args.backend, 'clips': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+import os
+
+import cv2
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+class VideoSource:
+    """
+    Frames from a camera index ("0"), a video file, or a directory of frame
+    images read in name order. `read()` returns (ok, image) like
+    cv2.VideoCapture.read. Recorded sources are not `live` and report their
+    own `fps` (`default_fps` for image directories and files without one),
+    so they can be replayed with their original timing.
+    """
+
+    def __init__(self, spec, default_fps=30.0):
+        self.spec = str(spec)
+        self.live = self.spec.isdigit()
+        self._capture = None
+        self._paths = None
+        if os.path.isdir(self.spec):
+            names = sorted(n for n in os.listdir(self.spec) if n.lower().endswith(IMAGE_EXTENSIONS))
+            self._paths = iter([os.path.join(self.spec, n) for n in names])
+            self.fps = default_fps
+            return
+        self._capture = cv2.VideoCapture(int(self.spec) if self.live else self.spec)
+        if not self._capture.isOpened():
+            raise RuntimeError(f"Cannot open video source {self.spec}")
+        self.fps = (not self.live and self._capture.get(cv2.CAP_PROP_FPS)) or default_fps
+
+    def read(self):
+        if self._capture is not None:
+            return self._capture.read()
+        for path in self._paths:
+            image = cv2.imread(path)
+            if image is not None:
+                return True, image
+            print(f"Skipping unreadable frame {path}")
+        return False, None
+
+    def frames(self):
+        while True:
+            ok, image = self.read()
+            if not ok:
+                return
+            yield image
+
+    def release(self):
+        if self._capture is not None:
+            self._capture.release()
+
+
+def read_clip(path, default_fps=30.0):
+    """Decode a video file or a directory of frame images into (frames, fps)"""
+    source = VideoSource(path, default_fps)
+    frames = list(source.frames())
+    source.release()
+    return frames, source.fps
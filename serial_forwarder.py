@@ -1,61 +1,573 @@
 import serial
 import requests
+import argparse
 import json
+import os
+import random
+import re
+import sqlite3
+import statistics
+import threading
 import time
+import tty
+from collections import deque
 
-def forward_to_backend(data):
-    try:
-        print(f"Attempting to send data to backend: {data}")
-        response = requests.post('http://35.21.212.228:5000/api/current-stats', json=data)
-        print(f"Response status: {response.status_code}")
-        print(f"Response content: {response.text}")
-        return response.status_code == 200
-    except Exception as e:
-        print(f"Error sending to backend: {e}")
-        return False
+# The binary record layout is shared with the backend's decoder
+from backend import binary_format
 
-def main():
-    PORT = '/dev/cu.usbserial-141230'
-    BAUD_RATE = 115200
+BACKEND_URL = os.environ.get('WASTEWISE_BACKEND_URL', 'http://35.21.212.228:5000')
+BIN_ID = os.environ.get('WASTEWISE_BIN_ID', 'bin-1')
+PORT = os.environ.get('WASTEWISE_SERIAL_PORT', '/dev/cu.usbserial-141230')
+BAUD_RATE = 115200
+SPOOL_PATH = os.environ.get('WASTEWISE_SPOOL_PATH', 'forwarder_spool.db')
+# Send readings as compact binary records instead of JSON
+USE_BINARY = os.environ.get('WASTEWISE_FORWARDER_BINARY', '0') == '1'
+
+class ReadingSpool:
+    """
+    Append-only on-disk journal of readings awaiting upload, kept in SQLite.
+
+    Readings are appended before upload and deleted once the backend
+    acknowledges them, so nothing is lost while the backend is unreachable
+    or the forwarder restarts. Sequence numbers preserve arrival order. The
+    journal holds at most `max_readings`; beyond that the oldest readings
+    are evicted and counted.
+    """
+
+    def __init__(self, path, max_readings=500000):
+        self._max_readings = max_readings
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS spool ('
+            'seq INTEGER PRIMARY KEY AUTOINCREMENT, bin_id TEXT NOT NULL, timestamp REAL NOT NULL, '
+            'fill_level REAL NOT NULL, temperature REAL, waste_type TEXT)'
+        )
+        self._connection.commit()
+        self._lock = threading.Lock()
+        self._size = self._connection.execute('SELECT COUNT(*) FROM spool').fetchone()[0]
+        self.evicted = 0
+
+    def __len__(self):
+        with self._lock:
+            return self._size
+
+    def append(self, reading):
+        with self._lock:
+            cursor = self._connection.execute(
+                'INSERT INTO spool (bin_id, timestamp, fill_level, temperature, waste_type) VALUES (?, ?, ?, ?, ?)',
+                (reading['bin_id'], reading['timestamp'], reading['fill_level'],
+                 reading.get('temperature'), reading.get('waste_type'))
+            )
+            self._size += 1
+            if self._size > self._max_readings:
+                # Keep only the newest max_readings sequence numbers: one range delete, oldest first
+                evicted = self._connection.execute(
+                    'DELETE FROM spool WHERE seq <= ?', (cursor.lastrowid - self._max_readings,)
+                ).rowcount
+                self._size -= evicted
+                self.evicted += evicted
+            self._connection.commit()
+
+    def last_seq(self):
+        with self._lock:
+            return self._connection.execute('SELECT COALESCE(MAX(seq), 0) FROM spool').fetchone()[0]
+
+    def read(self, after, until=None, limit=1000):
+        """Oldest readings with after < seq <= until, as (seq, reading) pairs"""
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT seq, bin_id, timestamp, fill_level, temperature, waste_type FROM spool '
+                'WHERE seq > ? AND seq <= ? ORDER BY seq LIMIT ?',
+                (after, until if until is not None else 2 ** 63 - 1, limit)
+            ).fetchall()
+        pairs = []
+        for seq, bin_id, timestamp, fill_level, temperature, waste_type in rows:
+            reading = {'bin_id': bin_id, 'timestamp': timestamp, 'fill_level': fill_level}
+            if temperature is not None:
+                reading['temperature'] = temperature
+            if waste_type is not None:
+                reading['waste_type'] = waste_type
+            pairs.append((seq, reading))
+        return pairs
+
+    def ack(self, seqs):
+        """Delete delivered readings"""
+        with self._lock:
+            deleted = 0
+            for start in range(0, len(seqs), 500):
+                chunk = seqs[start:start + 500]
+                deleted += self._connection.execute(
+                    f"DELETE FROM spool WHERE seq IN ({','.join('?' * len(chunk))})", chunk
+                ).rowcount
+            self._connection.commit()
+            self._size -= deleted
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+class Uploader:
+    """
+    Uploads spooled readings to the batch endpoint on its own thread, so a
+    slow or unreachable backend never stalls the serial reader.
+
+    Readings go to the spool first. While the backend keeps up, a batch is
+    sent once it holds `batch_size` readings or its oldest reading has waited
+    `max_delay` seconds, over one keep-alive session. When an upload fails,
+    everything spooled so far becomes backlog; failed requests are retried
+    with exponential backoff and jitter. Once the backend is back, every
+    request carries the live readings that arrived since the failure first
+    and then up to `catch_up_size` backlog readings, oldest first, so a
+    backlog of hours drains at many times the live rate without delaying
+    live readings behind it.
+    """
+
+    def __init__(self, spool, base_url=BACKEND_URL, batch_size=50, max_delay=1.0, catch_up_size=2000,
+                 backoff=0.5, max_backoff=30.0, timeout=10.0, binary=USE_BINARY):
+        self._spool = spool
+        self._url = base_url.rstrip('/') + '/api/measurements/batch'
+        self._batch_size = batch_size
+        self._max_delay = max_delay
+        self._catch_up_size = catch_up_size
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._timeout = timeout
+        self._binary = binary
+        self._session = requests.Session()
+        self._appended = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='uploader', daemon=True)
+        self._latencies = deque(maxlen=10000)  # seconds from live reading to acknowledgement
+        self._lock = threading.Lock()
+        self._counts = {'sent': 0, 'replayed': 0, 'rejected': 0, 'batches': 0, 'retries': 0}
+        # Readings up to this sequence number are backlog; anything left over from
+        # a previous run starts out as backlog too
+        self._backlog_until = spool.last_seq()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def offer(self, reading):
+        """Spool a reading for upload"""
+        self._spool.append(reading)
+        self._appended.set()
+
+    def stop(self, timeout=10.0):
+        """Send what the backend will take within `timeout` seconds; the rest stays spooled"""
+        self._stopping.set()
+        self._appended.set()
+        self._thread.join(timeout)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def _next_batch(self):
+        """Wait for the next request's (live, backlog) readings; both empty if there are none"""
+        while True:
+            self._appended.clear()
+            backlog = []
+            if self._backlog_until:
+                backlog = self._spool.read(0, self._backlog_until, self._catch_up_size)
+                if not backlog:
+                    self._backlog_until = 0
+            live = self._spool.read(self._backlog_until, limit=self._batch_size)
+            if backlog or len(live) >= self._batch_size or self._stopping.is_set():
+                return live, backlog
+            wait = 0.5
+            if live:
+                wait = self._max_delay - (time.time() - live[0][1]['timestamp'])
+                if wait <= 0:
+                    return live, backlog
+            self._appended.wait(wait)
+
+    def _post(self, batch):
+        if self._binary:
+            return self._session.post(self._url, data=binary_format.encode(batch), timeout=self._timeout,
+                                      headers={'Content-Type': binary_format.CONTENT_TYPE})
+        return self._session.post(self._url, json={'readings': batch}, timeout=self._timeout)
+
+    def _drop_unencodable(self, entries):
+        """Ack and count readings the binary format can't carry, e.g. spooled by an earlier JSON run; returns the rest"""
+        encodable, dropped = [], []
+        for seq, reading in entries:
+            try:
+                binary_format.encode_bin_id(reading['bin_id'])
+            except ValueError as e:
+                print(f"Dropping reading that cannot be encoded: {e}")
+                dropped.append(seq)
+            else:
+                encodable.append((seq, reading))
+        if dropped:
+            self._count('rejected', len(dropped))
+            self._spool.ack(dropped)
+        return encodable
+
+    def _send(self, live, backlog):
+        """Deliver one request's readings; returns the error if it has to be retried later"""
+        if self._binary:
+            live, backlog = self._drop_unencodable(live), self._drop_unencodable(backlog)
+            if not live and not backlog:
+                return None
+        batch = [reading for _, reading in live + backlog]
+        try:
+            response = self._post(batch)
+        except requests.RequestException as e:
+            error = e
+        else:
+            error = None
+            if response.ok:
+                acknowledged = time.time()
+                with self._lock:
+                    self._counts['sent'] += len(live)
+                    self._counts['replayed'] += len(backlog)
+                    self._counts['batches'] += 1
+                    self._latencies.extend(acknowledged - reading['timestamp'] for _, reading in live)
+            elif 400 <= response.status_code < 500 and response.status_code != 429:
+                print(f"Backend rejected batch ({response.status_code}): {response.text}")
+                self._count('rejected', len(batch))
+            else:
+                error = f"status {response.status_code}"
+        if error is not None:
+            # Everything spooled so far is replayed in order once the backend is back
+            self._backlog_until = self._spool.last_seq()
+            return error
+        self._spool.ack([seq for seq, _ in live + backlog])
+        return None
+
+    def _run(self):
+        attempt = 0
+        while True:
+            live, backlog = self._next_batch()
+            if not live and not backlog:
+                return  # stopping with nothing left to send
+            error = self._send(live, backlog)
+            if error is None:
+                attempt = 0
+                continue
+            if self._stopping.is_set():
+                print(f"Leaving {len(self._spool)} readings spooled at shutdown: {error}")
+                return
+            delay = min(self._max_backoff, self._backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+            print(f"Upload failed ({error}), retrying in {delay:.1f}s")
+            self._count('retries')
+            attempt += 1
+            self._stopping.wait(delay)
+
+    def stats(self):
+        """Counters plus p50/p95/max live reading-to-acknowledgement latency in ms"""
+        with self._lock:
+            stats = dict(self._counts)
+            latencies = sorted(self._latencies)
+        stats['spooled'] = len(self._spool)
+        stats['evicted'] = self._spool.evicted
+        for name, pct in (('p50', 50), ('p95', 95), ('max', 100)):
+            index = min(len(latencies) - 1, int(len(latencies) * pct / 100))
+            stats[f'latency_{name}_ms'] = round(latencies[index] * 1000, 1) if latencies else None
+        return stats
+
+# The ESP32 logs e.g. "I (1234) hc-sr04: Distance: 12.34cm, Fill Level: 56.78%"
+FILL_LEVEL_PATTERN = re.compile(rb'Fill Level:\s*(-?\d+(?:\.\d+)?)')
+
+class SerialLineReader:
+    """
+    Splits a serial stream into lines.
+
+    Each read blocks until at least one byte arrives or the port's timeout
+    expires, then takes everything the driver has buffered in one call, so
+    a burst of lines costs one read instead of one read per byte. Partial
+    lines stay in a bytearray until their newline arrives.
+    """
 
-    while True:
+    def __init__(self, port, max_line_length=4096):
+        self._port = port
+        self._max_line_length = max_line_length
+        self._buffer = bytearray()
+
+    def read_lines(self):
+        """Return the complete lines received so far, empty if the port timed out"""
+        chunk = self._port.read(max(1, self._port.in_waiting))
+        if not chunk:
+            return []
+        self._buffer += chunk
+        end = self._buffer.rfind(b'\n')
+        if end < 0:
+            if len(self._buffer) > self._max_line_length:
+                self._buffer.clear()  # no newline in sight: line noise, not a log line
+            return []
+        lines = self._buffer[:end].split(b'\n')
+        del self._buffer[:end + 1]
+        return [bytes(line).strip() for line in lines]
+
+def parse_fill_level(line):
+    """Extract the fill level from a sensor log line, or None if it has none"""
+    match = FILL_LEVEL_PATTERN.search(line)
+    return float(match.group(1)) if match else None
+
+def benchmark_reader(seconds, line=b'I (123456) hc-sr04: Distance: 23.45cm, Fill Level: 67.89%\r\n'):
+    """Measure sustained lines/sec through SerialLineReader over pyserial's loopback port"""
+    port = serial.serial_for_url('loop://', timeout=1)
+    deadline = time.monotonic() + seconds
+    burst = line * 64
+    stopping = threading.Event()
+
+    def write():
         try:
-            print(f"Attempting to connect to {PORT}...")
-            ser = serial.Serial(PORT, BAUD_RATE, timeout=1)
-            print("Serial connection established")
-            
-            buffer = ""
-            while True:
-                if ser.in_waiting:
-                    char = ser.read().decode('utf-8')
-                    if char == '\n':
-                        line = buffer.strip()
-                        print(f"Raw data received: '{line}'")
-                        
-                        # Extract fill level from log message
-                        if "Fill Level:" in line:
-                            try:
-                                fill_level = float(line.split("Fill Level: ")[1].replace("%", ""))
-                                data = {"fill_level": fill_level}
-                                print(f"Extracted data: {data}")
-                                success = forward_to_backend(data)
-                                if not success:
-                                    print("Failed to send data to backend")
-                            except Exception as e:
-                                print(f"Error extracting fill level: {e}")
-                        
-                        buffer = ""
-                    else:
-                        buffer += char
-                        
-                time.sleep(0.1)
-                
-        except serial.SerialException as e:
-            print(f"Serial port error: {e}")
-            time.sleep(1)
-        except KeyboardInterrupt:
-            print("Exiting...")
-            break
+            while not stopping.is_set():
+                port.write(burst)
+        except serial.SerialException:
+            pass  # port closed under a write that was waiting for room
+
+    writer = threading.Thread(target=write, daemon=True)
+    reader = SerialLineReader(port)
+    lines = 0
+    started = time.monotonic()
+    writer.start()
+    while time.monotonic() < deadline:
+        for received in reader.read_lines():
+            if parse_fill_level(received) is not None:
+                lines += 1
+    elapsed = time.monotonic() - started
+    # Closing the port releases a writer blocked on a full loopback buffer
+    stopping.set()
+    port.close()
+    writer.join(timeout=5)
+    print(f"Parsed {lines} lines in {elapsed:.1f}s: {lines / elapsed:,.0f} lines/s "
+          f"({lines / elapsed / 2:,.0f}x the sensor's 2 lines/s)")
+
+class ReadingFilter:
+    """
+    Decides which of one sensor's readings are worth uploading.
+
+    Raw fill levels pass through a running median over the last `window`
+    readings, which discards the HC-SR04's isolated echo spikes; a real step
+    such as the bin being emptied comes through once it fills half the
+    window. The median is sent only when it has moved at least `deadband`
+    points from the last value sent, or when `heartbeat` seconds have passed
+    since then, so the backend still hears from a bin that is not changing.
+    """
+
+    def __init__(self, window=5, deadband=1.0, heartbeat=60.0):
+        self._recent = deque(maxlen=max(1, window))
+        self._deadband = deadband
+        self._heartbeat = heartbeat
+        self._last_sent = None
+        self._last_sent_at = None
+        self.received = 0
+        self.sent = 0
+
+    def process(self, fill_level, timestamp):
+        """Return the filtered fill level to upload, or None to skip this reading"""
+        self.received += 1
+        self._recent.append(fill_level)
+        filtered = round(statistics.median(self._recent), 2)
+        if (self._last_sent is not None
+                and abs(filtered - self._last_sent) < self._deadband
+                and timestamp - self._last_sent_at < self._heartbeat):
+            return None
+        self._last_sent = filtered
+        self._last_sent_at = timestamp
+        self.sent += 1
+        return filtered
+
+class PortReader:
+    """
+    Reads one serial port on its own thread and offers its fill levels to the
+    shared uploader under the port's bin id. The port is reopened with
+    backoff whenever it fails or disappears, e.g. when a sensor is unplugged.
+    """
+
+    def __init__(self, port, bin_id, uploader, baud=BAUD_RATE, max_reconnect_delay=30.0, reading_filter=None):
+        self.port = port
+        self.bin_id = bin_id
+        self._uploader = uploader
+        self.filter = reading_filter or ReadingFilter(window=1, deadband=0, heartbeat=0)
+        self._baud = baud
+        self._max_reconnect_delay = max_reconnect_delay
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'reader-{bin_id}', daemon=True)
+        self.connected = False
+        self.reconnects = 0
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def _run(self):
+        delay = 1.0
+        while not self._stopping.is_set():
+            try:
+                # A short timeout bounds how long stop() waits for an idle port
+                with serial.Serial(self.port, self._baud, timeout=1) as ser:
+                    print(f"[{self.bin_id}] Connected to {self.port}")
+                    self.connected = True
+                    delay = 1.0
+                    reader = SerialLineReader(ser)
+                    while not self._stopping.is_set():
+                        for line in reader.read_lines():
+                            fill_level = parse_fill_level(line)
+                            if fill_level is None:
+                                continue
+                            timestamp = time.time()
+                            fill_level = self.filter.process(fill_level, timestamp)
+                            if fill_level is not None:
+                                self._uploader.offer({'bin_id': self.bin_id, 'timestamp': timestamp,
+                                                      'fill_level': fill_level})
+            except (serial.SerialException, OSError) as e:
+                print(f"[{self.bin_id}] Serial port error on {self.port}: {e}")
+            if self.connected:
+                self.connected = False
+                self.reconnects += 1
+            self._stopping.wait(delay)
+            delay = min(self._max_reconnect_delay, delay * 2)
+
+def parse_port_map(port_args, ports_file=None):
+    """Build {port: bin_id} from PATH[=BIN_ID] arguments and an optional JSON file of the same mapping"""
+    ports = {}
+    if ports_file:
+        with open(ports_file) as f:
+            ports.update(json.load(f))
+    for arg in port_args or []:
+        port, _, bin_id = arg.partition('=')
+        ports[port] = bin_id or BIN_ID
+    return ports or {PORT: BIN_ID}
+
+class SimulatedSensors:
+    """
+    Pseudo-terminals standing in for ESP32s: each emits the sensor's log line
+    at `rate` Hz with a slowly rising fill level, for exercising the
+    forwarder with many ports on one machine.
+    """
+
+    def __init__(self, count, rate=2.0):
+        self._rate = rate
+        self._masters = []
+        self.ports = {}
+        for index in range(count):
+            master, slave = os.openpty()
+            tty.setraw(slave)
+            os.set_blocking(master, False)
+            self._masters.append(master)
+            self.ports[os.ttyname(slave)] = f'sim-{index + 1}'
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='simulated-sensors', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        self._thread.join()
+        for master in self._masters:
+            os.close(master)
+
+    def _run(self):
+        fill_levels = [random.uniform(0, 50) for _ in self._masters]
+        next_tick = time.monotonic()
+        while not self._stopping.is_set():
+            for index, master in enumerate(self._masters):
+                fill_levels[index] = min(100.0, fill_levels[index] + random.uniform(0, 0.1))
+                # About one reading in a hundred is a stray echo, as with the real HC-SR04
+                fill_level = random.uniform(0, 100) if random.random() < 0.01 else fill_levels[index]
+                distance = 40 * (1 - fill_level / 100)
+                line = f'I ({int(time.monotonic() * 1000)}) hc-sr04: Distance: {distance:.2f}cm, ' \
+                       f'Fill Level: {fill_level:.2f}%\r\n'
+                try:
+                    os.write(master, line.encode('ascii'))
+                except BlockingIOError:
+                    pass  # nobody is reading this port; drop the line like a real UART would
+            next_tick += 1 / self._rate
+            self._stopping.wait(max(0.0, next_tick - time.monotonic()))
+
+def filter_summary(readers):
+    received = sum(reader.filter.received for reader in readers)
+    sent = sum(reader.filter.sent for reader in readers)
+    ratio = f"{received / sent:.1f}x" if sent else 'n/a'
+    return f"readings: {received} received, {sent} uploaded ({ratio} compression)"
+
+def main():
+    parser = argparse.ArgumentParser(description='Forward ESP32 fill level readings to the WasteWise backend')
+    parser.add_argument('--port', action='append', metavar='PATH[=BIN_ID]',
+                        help='serial port of an ESP32 and the bin it measures; repeat for more bins')
+    parser.add_argument('--ports-file', help='JSON object mapping serial ports to bin ids')
+    parser.add_argument('--baud', type=int, default=BAUD_RATE)
+    parser.add_argument('--backend', default=BACKEND_URL, help='backend base URL')
+    parser.add_argument('--batch-size', type=int, default=50, help='most readings per upload')
+    parser.add_argument('--max-delay', type=float, default=1.0,
+                        help='seconds a reading may wait for its batch to fill')
+    parser.add_argument('--spool', default=SPOOL_PATH, help='SQLite file readings are journaled to before upload')
+    parser.add_argument('--spool-max', type=int, default=500000,
+                        help='most readings kept while the backend is unreachable; the oldest are evicted')
+    parser.add_argument('--report-interval', type=float, default=60.0,
+                        help='seconds between upload statistics reports')
+    parser.add_argument('--median-window', type=int, default=5,
+                        help='readings in the running median that removes spikes; 1 disables it')
+    parser.add_argument('--deadband', type=float, default=1.0,
+                        help='smallest fill level change, in points, worth uploading; 0 sends every reading')
+    parser.add_argument('--heartbeat', type=float, default=60.0,
+                        help='seconds after which an unchanged fill level is uploaded anyway')
+    parser.add_argument('--simulate-sensors', type=int, metavar='COUNT',
+                        help='read from this many simulated sensors on pseudo-terminals instead of real ports')
+    parser.add_argument('--benchmark-reader', type=float, metavar='SECONDS',
+                        help='measure line reader throughput on a loopback port and exit')
+    args = parser.parse_args()
+    if args.benchmark_reader:
+        benchmark_reader(args.benchmark_reader)
+        return
+
+    simulation = None
+    if args.simulate_sensors:
+        simulation = SimulatedSensors(args.simulate_sensors).start()
+        ports = simulation.ports
+    else:
+        ports = parse_port_map(args.port, args.ports_file)
+
+    if USE_BINARY:
+        unencodable = []
+        for bin_id in ports.values():
+            try:
+                binary_format.encode_bin_id(bin_id)
+            except ValueError:
+                unencodable.append(bin_id)
+        if unencodable:
+            parser.error(f"only ASCII bin ids of at most {binary_format.MAX_BIN_ID_BYTES} characters can be sent as "
+                         f"binary records, unset WASTEWISE_FORWARDER_BINARY: {', '.join(unencodable)}")
+
+    spool = ReadingSpool(args.spool, args.spool_max)
+    uploader = Uploader(spool, args.backend, batch_size=args.batch_size, max_delay=args.max_delay).start()
+    readers = [
+        PortReader(port, bin_id, uploader, args.baud,
+                   reading_filter=ReadingFilter(args.median_window, args.deadband, args.heartbeat)).start()
+        for port, bin_id in ports.items()
+    ]
+    print(f"Forwarding {len(readers)} port(s) to {args.backend}")
+    try:
+        while True:
+            time.sleep(args.report_interval)
+            connected = sum(reader.connected for reader in readers)
+            print(f"Ports connected: {connected}/{len(readers)}, {filter_summary(readers)}, "
+                  f"upload stats: {uploader.stats()}")
+    except KeyboardInterrupt:
+        print("Exiting...")
+    for reader in readers:
+        reader.stop()
+    for reader in readers:
+        reader.join()
+    if simulation:
+        simulation.stop()
+    uploader.stop()
+    print(f"{filter_summary(readers)}, upload stats: {uploader.stats()}")
+    spool.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import './Alerts.css';
-import { fetchAlerts, dismissAlert } from '../utils/api';
+import { fetchAlerts, dismissAlert, subscribeToEvents } from '../utils/api';
 
 const Alerts = () => {
   const [alerts, setAlerts] = useState([]);
@@ -16,9 +16,21 @@ const Alerts = () => {
       }
     };
 
-    fetchAlertData();
-    const interval = setInterval(fetchAlertData, 30000);
-    return () => clearInterval(interval);
+    return subscribeToEvents({
+      open: fetchAlertData,
+      resync: fetchAlertData,
+      'bin-reset': fetchAlertData,
+      'alert-created': (alert) => setAlerts(prev => [alert, ...prev.filter(a => a.id !== alert.id)]),
+      'alert-updated': (alert) => setAlerts(prev => [alert, ...prev.filter(a => a.id !== alert.id)]),
+      'alert-dismissed': ({ id, ids }) => {
+        const dismissed = new Set(ids || [id]);
+        setAlerts(prev => prev.filter(alert => !dismissed.has(alert.id)));
+      },
+      'alert-read': ({ ids }) => {
+        const read = new Set(ids);
+        setAlerts(prev => prev.map(alert => (read.has(alert.id) ? { ...alert, isRead: true } : alert)));
+      },
+    });
   }, []);
 
   const handleDismiss = async (alertId) => {
@@ -57,6 +69,9 @@ const Alerts = () => {
           <div key={alert.id} className="alert-card">
             <div className="alert-header">
               <h3>{alert.message}</h3>
+              {alert.occurrences > 1 && (
+                <span className="alert-occurrences">×{alert.occurrences}</span>
+              )}
             </div>
             <div className="alert-details">
               <div className="alert-location">
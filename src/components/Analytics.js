@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import './Analytics.css';
-import { fetchCurrentStats } from '../utils/api';
+import { fetchCurrentStats, subscribeToEvents, DEFAULT_BIN_ID } from '../utils/api';
 
 const Analytics = () => {
   const [stats, setStats] = useState({
@@ -17,9 +17,12 @@ const Analytics = () => {
       }
     };
 
-    fetchStats();
-    const interval = setInterval(fetchStats, 30000);
-    return () => clearInterval(interval);
+    return subscribeToEvents({
+      open: fetchStats,
+      resync: fetchStats,
+      'bin-reset': fetchStats,
+      'fill-level': setStats,
+    }, { binIds: [DEFAULT_BIN_ID] });
   }, []);
 
   return (
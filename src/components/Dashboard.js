@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useRef } from 'react';
 import './Dashboard.css';
-import { fetchCurrentStats, resetBin, fetchAlerts } from '../utils/api';
+import { fetchCurrentStats, resetBin, fetchAlerts, subscribeToEvents, DEFAULT_BIN_ID } from '../utils/api';
 import toast, { Toaster } from 'react-hot-toast';
 
 const Dashboard = () => {
@@ -11,6 +11,24 @@ const Dashboard = () => {
   const previousAlerts = useRef([]);
 
   useEffect(() => {
+    const showAlertToast = (alert) => {
+      toast(
+        <div className="alert-toast">
+          <div className="alert-toast-title">{alert.message}</div>
+          <div className="alert-toast-location">{alert.location}</div>
+        </div>,
+        {
+          duration: 5000,
+          style: {
+            background: '#34495e',
+            color: '#fff',
+            padding: '16px',
+          },
+          icon: '⚠️',
+        }
+      );
+    };
+
     const fetchStats = async () => {
       try {
         const data = await fetchCurrentStats();
@@ -20,12 +38,6 @@ const Dashboard = () => {
       }
     };
 
-    fetchStats();
-    const interval = setInterval(fetchStats, 30000);
-    return () => clearInterval(interval);
-  }, []);
-
-  useEffect(() => {
     const fetchAlertData = async () => {
       try {
         const data = await fetchAlerts();
@@ -35,24 +47,7 @@ const Dashboard = () => {
               prevAlert => prevAlert.id === alert.id
             )
           );
-          
-          newAlerts.forEach(alert => {
-            toast(
-              <div className="alert-toast">
-                <div className="alert-toast-title">{alert.message}</div>
-                <div className="alert-toast-location">{alert.location}</div>
-              </div>,
-              {
-                duration: 5000,
-                style: {
-                  background: '#34495e',
-                  color: '#fff',
-                  padding: '16px',
-                },
-                icon: '⚠️',
-              }
-            );
-          });
+          newAlerts.forEach(showAlertToast);
         }
         
         setAlerts(data);
@@ -62,9 +57,41 @@ const Dashboard = () => {
       }
     };
 
-    fetchAlertData();
-    const interval = setInterval(fetchAlertData, 30000);
-    return () => clearInterval(interval);
+    const refresh = () => {
+      fetchStats();
+      fetchAlertData();
+    };
+
+    // Initial state comes from the REST endpoints; after that the server pushes changes
+    return subscribeToEvents({
+      open: refresh,
+      resync: refresh,
+      'bin-reset': refresh,
+      'fill-level': setStats,
+      'alert-created': (alert) => {
+        showAlertToast(alert);
+        setAlerts(prev => {
+          const next = [alert, ...prev.filter(a => a.id !== alert.id)];
+          previousAlerts.current = next;
+          return next;
+        });
+      },
+      'alert-updated': (alert) => {
+        setAlerts(prev => {
+          const next = [alert, ...prev.filter(a => a.id !== alert.id)];
+          previousAlerts.current = next;
+          return next;
+        });
+      },
+      'alert-dismissed': ({ id, ids }) => {
+        const dismissed = new Set(ids || [id]);
+        setAlerts(prev => {
+          const next = prev.filter(alert => !dismissed.has(alert.id));
+          previousAlerts.current = next;
+          return next;
+        });
+      },
+    }, { binIds: [DEFAULT_BIN_ID] });
   }, []);
 
   const handleReset = async () => {
@@ -38,8 +38,14 @@ export const resetBin = async () => {
   return response.json();
 };
 
-export const fetchHistoricalStats = async () => {
-  const response = await fetch(`${API_BASE_URL}/historical-stats`);
+export const fetchHistoricalStats = async ({ cursor, limit, start, end } = {}) => {
+  const params = new URLSearchParams();
+  if (cursor) params.set('cursor', cursor);
+  if (limit) params.set('limit', limit);
+  if (start) params.set('start', start);
+  if (end) params.set('end', end);
+  const query = params.toString();
+  const response = await fetch(`${API_BASE_URL}/historical-stats${query ? `?${query}` : ''}`);
   if (!response.ok) throw new Error('Failed to fetch historical stats');
   return response.json();
 };
@@ -50,4 +56,40 @@ export const dismissAlert = async (alertId) => {
   });
   if (!response.ok) throw new Error('Failed to dismiss alert');
   return response.json();
-}; 
\ No newline at end of file
+};
+
+// `selection` is { ids: [...] }, or any of { location, before, unread }, or { all: true }
+const bulkAlertAction = (action) => async (selection) => {
+  const response = await fetch(`${API_BASE_URL}/alerts/${action}`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(selection)
+  });
+  if (!response.ok) throw new Error(`Failed to ${action} alerts`);
+  return response.json();
+};
+
+export const dismissAlerts = bulkAlertAction('dismiss');
+export const acknowledgeAlerts = bulkAlertAction('acknowledge');
+
+export const DEFAULT_BIN_ID = 'bin-1';
+
+// Opens the server-sent event stream. `handlers` maps event names
+// ('fill-level', 'alert-created', 'alert-updated', 'alert-dismissed', 'alert-read',
+// 'bin-reset', 'resync')
+// to callbacks receiving the parsed payload; `open` is called on every
+// (re)connect so callers can refetch anything missed while disconnected.
+export const subscribeToEvents = (handlers, { binIds } = {}) => {
+  const query = binIds && binIds.length ? `?bin_id=${encodeURIComponent(binIds.join(','))}` : '';
+  const source = new EventSource(`${API_BASE_URL}/events${query}`);
+  Object.entries(handlers).forEach(([event, handler]) => {
+    if (event === 'open') {
+      source.onopen = handler;
+    } else {
+      source.addEventListener(event, (e) => handler(JSON.parse(e.data)));
+    }
+  });
+  return () => source.close();
+};